@@ -1,5 +1,34 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+# API field name -> model feature name (model_features.pkl)
+FEATURE_FIELDS = {
+    "cement_content": "Cement content",
+    "wc_ratio": "W/C ratio",
+    "scm_pct": "SCM %",
+    "ramp_rate": "Ramp rate",
+    "hold_temperature": "Hold temperature",
+    "ambient_temperature": "Ambient temperature",
+    "maturity_index": "Maturity index",
+    "mold_availability": "Mold availability",
+    "energy_tariff": "Energy tariff"
+}
+
+# Plausible [min, max] range per model feature, matching the dashboard inputs in app.py
+FEATURE_BOUNDS = {
+    "Cement content": (200.0, 600.0),
+    "W/C ratio": (0.20, 0.70),
+    "SCM %": (0.0, 60.0),
+    "Ramp rate": (5.0, 40.0),
+    "Hold temperature": (20.0, 85.0),
+    "Ambient temperature": (10.0, 50.0),
+    "Maturity index": (200.0, 1000.0),
+    "Mold availability": (50.0, 100.0),
+    "Energy tariff": (2.0, 15.0)
+}
+
+# Site conditions the plant cannot set; recommendations keep them at the scenario's value
+UNCONTROLLABLE_FEATURES = ("Ambient temperature", "Mold availability", "Energy tariff")
 
 class PredictionRequest(BaseModel):
     cement_content: float = 400.0
@@ -12,13 +41,132 @@ class PredictionRequest(BaseModel):
     mold_availability: float = 85.0
     energy_tariff: float = 7.0
 
+    def to_input_data(self):
+        return {feature: getattr(self, field) for field, feature in FEATURE_FIELDS.items()}
+
+class BatchPredictionRequest(BaseModel):
+    scenarios: List[PredictionRequest]
+
+class OptimizeRequest(BaseModel):
+    target_strength: float = 20.0
+    maxiter: int = 50
+    popsize: int = 15
+    seed: Optional[int] = 42
+    # vectorized scores each generation in one predict call; otherwise candidates are scored one by one
+    vectorized: bool = True
+
+class ParetoRequest(BaseModel):
+    # Site conditions (UNCONTROLLABLE_FEATURES) are held at the base scenario's values
+    base: PredictionRequest = PredictionRequest()
+    # [min, max] per PredictionRequest field; equal bounds pin a feature, and bounds on a
+    # site condition make it a search variable again
+    bounds: Dict[str, List[float]] = {}
+    objectives: List[str] = ["Cost per element", "Demould time", "Risk of under-strength"]
+    population_size: int = 100
+    generations: int = 100
+    seed: Optional[int] = 42
+    # Attach the simulated demould time of each front point's curing plan
+    simulate_curing: bool = True
+
+class SensitivityRequest(BaseModel):
+    base: PredictionRequest = PredictionRequest()
+    # PredictionRequest field names to sweep one at a time; empty sweeps all nine
+    features: List[str] = []
+    # Optional [min, max] per field; defaults to the dashboard input ranges
+    ranges: Dict[str, List[float]] = {}
+    points: int = 50
+    # Field pairs for 2-D sweeps, e.g. [["hold_temperature", "ambient_temperature"]]
+    pairs: List[List[str]] = []
+
+class CuringSchedule(BaseModel):
+    cement_content: float = 400.0
+    wc_ratio: float = 0.42
+    scm_pct: float = 25.0
+    ambient_temperature: float = 32.0
+    # Hours at ambient before heating, ramp in C/h, hold in C and hours, cooling in C/h
+    preset_hours: float = 2.0
+    ramp_rate: float = 20.0
+    hold_temperature: float = 65.0
+    hold_hours: float = 6.0
+    cool_rate: float = 10.0
+
+class CuringRequest(BaseModel):
+    schedules: List[CuringSchedule] = [CuringSchedule()]
+    horizon_hours: float = 48.0
+    step_hours: float = 0.25
+    demould_strength: float = 35.0
+    # Temperature/maturity/strength histories, downsampled to at most trajectory_points
+    # per schedule; summaries only when False
+    trajectories: bool = True
+    trajectory_points: int = 200
+
+class YardOrder(BaseModel):
+    order_id: Optional[str] = None
+    quantity: int = 1
+    # Due time in hours from the start of the simulation
+    due_hours: float = 168.0
+    # Mix and curing plan for every element of the order; sets its predicted demould time
+    plan: PredictionRequest = PredictionRequest()
+
+class YardRequest(BaseModel):
+    orders: List[YardOrder]
+    molds: int = 40
+    crews: int = 4
+    cast_hours: float = 1.5
+    strip_hours: float = 1.0
+    # Daily working window for casting and stripping; curing runs around the clock
+    shift_start_hour: float = 6.0
+    shift_hours: float = 16.0
+    horizon_days: float = 28.0
+
+class FeatureDistribution(BaseModel):
+    # normal: std (mean defaults to the base value); uniform: low, high;
+    # triangular: low, high, mode (defaults to the base value)
+    kind: str = "normal"
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+    mode: Optional[float] = None
+
+class UncertaintyRequest(BaseModel):
+    base: PredictionRequest = PredictionRequest()
+    # PredictionRequest field name -> distribution; other fields stay at their base value
+    distributions: Dict[str, FeatureDistribution] = {}
+    samples: int = 10000
+    seed: Optional[int] = 42
+    percentiles: List[float] = [5, 50, 95]
+    # Target name -> values for P(target > value), e.g. {"Risk of under-strength": [2.0]}
+    thresholds: Dict[str, List[float]] = {}
+    workers: int = 1
+
+class ScoreJobRequest(BaseModel):
+    # Paths are relative to SCORING_DIR on the server; output defaults to <input>_scored.<ext>
+    input_path: str
+    output_path: Optional[str] = None
+    chunksize: int = 50000
+    workers: int = 1
+
 class ChatMessage(BaseModel):
     role: str
     content: str
 
 class ChatRequest(BaseModel):
     messages: List[ChatMessage]
+    # With a session_id only the new messages are sent; history is kept server-side
+    session_id: Optional[str] = None
 
 class ReportRequest(BaseModel):
     metrics: dict
     insight: str
+
+class ReportScenario(BaseModel):
+    name: Optional[str] = None
+    # Either precomputed metrics or inputs for the model to score
+    metrics: Optional[dict] = None
+    inputs: Optional[PredictionRequest] = None
+    insight: str = ""
+
+class BulkReportRequest(BaseModel):
+    scenarios: List[ReportScenario]
+    title: str = "Candidate Mix Summary"
@@ -1,19 +1,17 @@
-import os
+import json
+import asyncio
+import contextlib
 from fastapi import APIRouter, HTTPException
-from google import genai
+from fastapi.responses import StreamingResponse
 from api.models import ChatRequest
+from api.services.executor import run_llm, stream_llm
+from api.services.gemini_client import get_client, GEMINI_MODEL
+from api.services.chat_sessions import ChatSession, get_session_store, session_lock, compact
+from api.services.metrics import span, STAGE_ERRORS
 
 router = APIRouter()
 
-@router.post("/chat")
-async def chat_endpoint(req: ChatRequest):
-    try:
-        if 'GEMINI_API_KEY' not in os.environ or not os.environ['GEMINI_API_KEY']:
-            raise HTTPException(status_code=500, detail="Gemini API key not configured")
-            
-        client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
-        
-        system_instruction = """
+SYSTEM_INSTRUCTION = """
         You are a highly specialized AI assistant for the 'Precast Digital Chemist' application by L&T.
         Your sole purpose is to answer questions related to this application, concrete mix optimization, 
         precast yard operations, and the metrics displayed on the dashboard (Strength gain rate, 
@@ -25,26 +23,144 @@ async def chat_endpoint(req: ChatRequest):
         3. If asked an out-of-context question, politely decline and steer the conversation back to the Precast Digital Chemist.
         4. Be professional, concise, and helpful.
         """
-        
-        # Format history for Gemini API
-        contents = []
-        for msg in req.messages:
-            role = 'user' if msg.role == 'user' else 'model'
-            contents.append({
-                "role": role,
-                "parts": [{"text": msg.content}]
-            })
-            
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=contents,
-            config=genai.types.GenerateContentConfig(
-                system_instruction=system_instruction,
-                temperature=0.3
-            )
-        )
+
+def _build_contents(messages):
+    # Format history for Gemini API
+    contents = []
+    for msg in messages:
+        role = 'user' if msg.role == 'user' else 'model'
+        contents.append({
+            "role": role,
+            "parts": [{"text": msg.content}]
+        })
+    return contents
+
+def _chat_config(summary=""):
+    from google import genai
+    system_instruction = SYSTEM_INSTRUCTION
+    if summary:
+        system_instruction += f"\n        Summary of the earlier conversation:\n        {summary}\n"
+    return genai.types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        temperature=0.3
+    )
+
+def _require_client():
+    client = get_client()
+    if client is None:
+        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+    return client
+
+async def _prepare_history(req):
+    # Stateless mode: the client sends the full history every turn
+    if req.session_id is None:
+        return None, _build_contents(req.messages), ""
+    session = get_session_store().get(req.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired chat session")
+    # Work on a draft: the stored session only changes once the model has replied
+    draft = session.copy()
+    for msg in req.messages:
+        draft.add(msg.role, msg.content)
+    await compact(draft)
+    return draft, _build_contents(draft.turns), draft.summary
+
+def _record_reply(session, text):
+    # Saves the new user turns and the reply together
+    if session is not None and text:
+        session.add('model', text)
+        get_session_store().save(session)
+
+def _exchange_lock(req):
+    # Held from reading the history to saving the reply, so concurrent turns on one
+    # session cannot interleave or overwrite each other
+    return session_lock(req.session_id) if req.session_id is not None else contextlib.nullcontext()
+
+@router.post("/chat/session")
+async def create_chat_session():
+    session = ChatSession()
+    get_session_store().save(session)
+    return {"session_id": session.id}
+
+@router.get("/chat/session/{session_id}")
+async def get_chat_session(session_id: str):
+    session = get_session_store().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired chat session")
+    return {
+        "session_id": session.id,
+        "summary": session.summary,
+        "messages": [t.model_dump() for t in session.turns],
+        "window_tokens": session.window_tokens()
+    }
+
+@router.delete("/chat/session/{session_id}")
+async def delete_chat_session(session_id: str):
+    get_session_store().delete(session_id)
+    return {"deleted": session_id}
+
+@router.post("/chat")
+async def chat_endpoint(req: ChatRequest):
+    try:
+        client = _require_client()
+        async with _exchange_lock(req):
+            session, contents, summary = await _prepare_history(req)
+            with span('llm_call'):
+                response = await run_llm(client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=contents,
+                    config=_chat_config(summary)
+                ))
+            _record_reply(session, response.text)
         
         return {"response": response.text}
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Gemini request timed out")
     except Exception as e:
+        STAGE_ERRORS.inc(stage='chat')
         print(f"Chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(req: ChatRequest):
+    client = _require_client()
+    if req.session_id is not None and get_session_store().get(req.session_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired chat session")
+
+    async def events():
+        try:
+            async with _exchange_lock(req):
+                session, contents, summary = await _prepare_history(req)
+                stream = stream_llm(client.aio.models.generate_content_stream(
+                    model=GEMINI_MODEL,
+                    contents=contents,
+                    config=_chat_config(summary)
+                ))
+                reply = []
+                async for chunk in stream:
+                    if chunk.text:
+                        reply.append(chunk.text)
+                        yield _sse({"text": chunk.text})
+                _record_reply(session, "".join(reply))
+            yield _sse({}, event="done")
+        except HTTPException as e:
+            yield _sse({"detail": e.detail}, event="error")
+        except asyncio.TimeoutError:
+            STAGE_ERRORS.inc(stage='chat_stream')
+            yield _sse({"detail": "Gemini request timed out"}, event="error")
+        except Exception as e:
+            STAGE_ERRORS.inc(stage='chat_stream')
+            print(f"Chat stream error: {str(e)}")
+            yield _sse({"detail": str(e)}, event="error")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
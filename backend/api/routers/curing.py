@@ -0,0 +1,66 @@
+import os
+import asyncio
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from api.models import CuringRequest, CuringSchedule
+from api.services.executor import run_simulation, SimulationBusy
+from api.services.curing import simulate_curing
+
+router = APIRouter()
+
+# Peak memory is roughly 50 bytes per time point (about 100 MB at the default cap)
+CURING_MAX_POINTS = int(os.environ.get('CURING_MAX_POINTS', 2000000))
+CURING_TIMEOUT = float(os.environ.get('CURING_TIMEOUT', 30))
+# Trajectories are downsampled to trajectory_points per schedule, and the total number
+# of returned values stays small enough for one JSON response
+CURING_MAX_TRAJECTORY_VALUES = int(os.environ.get('CURING_MAX_TRAJECTORY_VALUES', 200000))
+
+def _values(array, digits=2):
+    return [None if np.isnan(v) else round(float(v), digits) for v in array]
+
+@router.post("/curing/simulate")
+async def simulate(req: CuringRequest):
+    if not req.schedules:
+        raise HTTPException(status_code=422, detail="At least one schedule is required")
+    if req.step_hours <= 0 or req.horizon_hours < req.step_hours:
+        raise HTTPException(status_code=422, detail="Need step_hours > 0 and horizon_hours >= step_hours")
+    points = len(req.schedules) * (int(req.horizon_hours / req.step_hours) + 1)
+    if points > CURING_MAX_POINTS:
+        raise HTTPException(status_code=422, detail=f"Simulation needs {points} time points (limit {CURING_MAX_POINTS})")
+    if req.trajectories:
+        if req.trajectory_points < 2:
+            raise HTTPException(status_code=422, detail="trajectory_points must be at least 2")
+        values = len(req.schedules) * min(req.trajectory_points, points // len(req.schedules))
+        if values > CURING_MAX_TRAJECTORY_VALUES:
+            raise HTTPException(status_code=422, detail=(
+                f"Trajectories would return {values} points per series across all schedules (limit {CURING_MAX_TRAJECTORY_VALUES}); "
+                "lower trajectory_points, send fewer schedules or set trajectories to false"))
+    if any(s.ramp_rate <= 0 or s.cool_rate <= 0 or s.hold_hours < 0 or s.preset_hours < 0 for s in req.schedules):
+        raise HTTPException(status_code=422, detail="ramp_rate and cool_rate must be > 0; hold_hours and preset_hours >= 0")
+    try:
+        schedules = {field: np.array([getattr(s, field) for s in req.schedules], dtype=np.float64)
+                     for field in CuringSchedule.model_fields}
+        result = await run_simulation(simulate_curing, schedules, req.horizon_hours, req.step_hours, req.demould_strength,
+                                      timeout=CURING_TIMEOUT)
+        response = {
+            'demould_strength': req.demould_strength,
+            'demould_time': _values(result['demould_time']),
+            # Nurse-Saul C*h at demould, usable as the maturity_index of a PredictionRequest
+            'maturity_at_demould': _values(result['maturity_at_demould'], 1),
+            'equivalent_age_at_demould': _values(result['equivalent_age_at_demould']),
+            'final_strength': _values(result['final_strength'])
+        }
+        if req.trajectories:
+            # Evenly spaced samples that always keep the first and last time point
+            n = len(result['times'])
+            keep = np.unique(np.linspace(0, n - 1, min(req.trajectory_points, n)).round().astype(np.intp))
+            response['times'] = np.round(result['times'][keep], 4).tolist()
+            for key in ('temperature', 'maturity', 'equivalent_age', 'strength'):
+                response[key] = np.round(result[key][:, keep], 2).tolist()
+        return response
+    except SimulationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Curing simulation exceeded {CURING_TIMEOUT:g}s; send fewer schedules or a coarser step_hours")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+@router.get("/healthz")
+async def healthz():
+    # Liveness: the process is up and serving requests
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz():
+    # Readiness: the model is loaded and predictions will not pay a cold load
+    import ml_model
+    # One read: a swap or rollback between a check and a second read cannot fail this
+    active = ml_model.loaded_version()
+    if active is not None:
+        return {"status": "ready", "model_loaded": True, "model_version": active.version}
+    return JSONResponse(
+        status_code=503,
+        content={"status": "loading", "model_loaded": False, "error": ml_model.load_error()}
+    )
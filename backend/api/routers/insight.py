@@ -0,0 +1,18 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from api.services import insight_jobs
+
+router = APIRouter()
+
+@router.get("/insight/{insight_id}")
+async def get_insight(insight_id: str, wait: float = 0.0):
+    job = insight_jobs.get_job(insight_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired insight ID")
+    if wait > 0 and not job.done.is_set():
+        # Optional long-poll so clients do not need to spin
+        try:
+            await asyncio.wait_for(job.done.wait(), min(wait, 30.0))
+        except asyncio.TimeoutError:
+            pass
+    return job.to_dict()
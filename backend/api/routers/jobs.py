@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+from api.models import ScoreJobRequest
+from api.services import scoring_jobs
+
+router = APIRouter()
+
+@router.post("/jobs/score", status_code=202)
+async def start_scoring_job(req: ScoreJobRequest):
+    try:
+        job = scoring_jobs.submit(req.input_path, req.output_path, req.chunksize, req.workers)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}")
+async def get_scoring_job(job_id: str):
+    job = scoring_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job ID")
+    return job.to_dict()
@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from api.services.metrics import render, register_collector
+
+router = APIRouter()
+
+@register_collector
+def cache_metrics():
+    # Cache and queue state is read from the owning modules at scrape time
+    import ml_model
+    from api.services.insight_cache import insight_cache
+    from api.services.report_renderer import report_cache
+    from api.services import insight_jobs
+    caches = {
+        'prediction': ml_model.prediction_cache.stats(),
+        'insight': insight_cache.stats(),
+        'report': report_cache.stats()
+    }
+    active = ml_model.loaded_version()
+    if active is not None and active.grid is not None:
+        caches['response_grid'] = active.grid.stats()
+    return [
+        ('cache_hits_total', 'counter', 'Cache hits', [({'cache': n}, s['hits']) for n, s in caches.items()]),
+        ('cache_misses_total', 'counter', 'Cache misses', [({'cache': n}, s['misses']) for n, s in caches.items()]),
+        ('cache_hit_ratio', 'gauge', 'Cache hit ratio since start', [({'cache': n}, s['hit_rate']) for n, s in caches.items()]),
+        ('insight_queue_depth', 'gauge', 'Insight jobs waiting for an LLM worker', [({}, insight_jobs.queue_depth())])
+    ]
+
+@router.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,99 @@
+import os
+import asyncio
+from fastapi import APIRouter, HTTPException
+from api.models import OptimizeRequest, ParetoRequest, FEATURE_FIELDS
+from api.services.executor import run_simulation, SimulationBusy
+from api.services.pareto import pareto_search
+from api.services.curing import check_plans
+
+router = APIRouter()
+
+OPTIMIZE_MAX_ITER = int(os.environ.get('OPTIMIZE_MAX_ITER', 300))
+OPTIMIZE_MAX_POPSIZE = int(os.environ.get('OPTIMIZE_MAX_POPSIZE', 50))
+OPTIMIZE_TIMEOUT = float(os.environ.get('OPTIMIZE_TIMEOUT', 60))
+# Ranking is O(population^2) in memory, so both knobs are capped
+PARETO_MAX_POPULATION = int(os.environ.get('PARETO_MAX_POPULATION', 300))
+PARETO_MAX_GENERATIONS = int(os.environ.get('PARETO_MAX_GENERATIONS', 300))
+PARETO_TIMEOUT = float(os.environ.get('PARETO_TIMEOUT', 60))
+
+def _values(array, digits):
+    return [None if v != v else round(float(v), digits) for v in array]
+
+def _pareto(simulate_curing, *args):
+    # Runs on the simulation pool: resolving the features may load the model
+    from ml_model import predict_matrix, get_features, TARGETS
+    result = pareto_search(predict_matrix, get_features(), TARGETS, *args)
+    front = result['front']
+    if simulate_curing and front:
+        # Holds each front point at temperature for its predicted demould time and records
+        # when the curing simulator says it actually reaches demould strength
+        demould, maturity = check_plans([p['inputs'] for p in front], [p['metrics']['Demould time'] for p in front])
+        for point, t, m in zip(front, _values(demould, 2), _values(maturity, 1)):
+            point['curing'] = {'demould_time': t, 'maturity_at_demould': m}
+    return result
+
+@router.post("/optimize")
+async def optimize_recipe(req: OptimizeRequest):
+    if not 1 <= req.maxiter <= OPTIMIZE_MAX_ITER:
+        raise HTTPException(status_code=422, detail=f"maxiter must be between 1 and {OPTIMIZE_MAX_ITER}")
+    if not 1 <= req.popsize <= OPTIMIZE_MAX_POPSIZE:
+        raise HTTPException(status_code=422, detail=f"popsize must be between 1 and {OPTIMIZE_MAX_POPSIZE}")
+    try:
+        from ai_model import optimize_recipe as run_optimizer
+        # Always in-process (workers=1): the API never starts process pools for a request
+        return await run_simulation(
+            run_optimizer,
+            req.target_strength,
+            req.maxiter,
+            req.popsize,
+            0.01,
+            req.seed,
+            1,
+            req.vectorized,
+            timeout=OPTIMIZE_TIMEOUT
+        )
+    except SimulationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Optimization exceeded {OPTIMIZE_TIMEOUT:g}s; lower maxiter or popsize")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/optimize/pareto")
+async def optimize_pareto(req: ParetoRequest):
+    unknown = [k for k in req.bounds if k not in FEATURE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown features in bounds: {unknown}")
+    bad = [k for k, pair in req.bounds.items() if len(pair) != 2 or pair[0] > pair[1]]
+    if bad:
+        raise HTTPException(status_code=422, detail=f"Bounds must be [min, max] pairs with min <= max: {bad}")
+    if not 4 <= req.population_size <= PARETO_MAX_POPULATION:
+        raise HTTPException(status_code=422, detail=f"population_size must be between 4 and {PARETO_MAX_POPULATION}")
+    if not 0 <= req.generations <= PARETO_MAX_GENERATIONS:
+        raise HTTPException(status_code=422, detail=f"generations must be between 0 and {PARETO_MAX_GENERATIONS}")
+    try:
+        bounds = {FEATURE_FIELDS[k]: v for k, v in req.bounds.items()}
+        result = await run_simulation(
+            _pareto,
+            req.simulate_curing,
+            bounds,
+            req.objectives,
+            req.population_size,
+            req.generations,
+            req.seed,
+            req.base.to_input_data(),
+            timeout=PARETO_TIMEOUT
+        )
+        # Report inputs with the same field names /predict accepts
+        to_field = {feature: field for field, feature in FEATURE_FIELDS.items()}
+        for point in result['front']:
+            point['inputs'] = {to_field[f]: v for f, v in point['inputs'].items()}
+        return result
+    except SimulationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Pareto search exceeded {PARETO_TIMEOUT:g}s; lower population_size or generations")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
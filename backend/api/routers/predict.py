@@ -1,32 +1,39 @@
 from fastapi import APIRouter, HTTPException
-from api.models import PredictionRequest
-from api.services.ai_service import generate_ai_context
+import os
+import asyncio
+from api.models import PredictionRequest, BatchPredictionRequest, UncertaintyRequest, FEATURE_FIELDS
+from api.services.ai_service import fallback_context
+from api.services import insight_jobs
+from api.services.executor import run_inference, run_simulation, SimulationBusy
+from api.services.batcher import get_predict_batcher
 
 router = APIRouter()
 
+UNCERTAINTY_MAX_SAMPLES = int(os.environ.get('UNCERTAINTY_MAX_SAMPLES', 5000000))
+UNCERTAINTY_TIMEOUT = float(os.environ.get('UNCERTAINTY_TIMEOUT', 300))
+UNCERTAINTY_MAX_WORKERS = int(os.environ.get('UNCERTAINTY_MAX_WORKERS', min(4, os.cpu_count() or 1)))
+
 @router.post("/predict")
 async def predict_ml(req: PredictionRequest):
     try:
         from ml_model import get_prediction
-        input_data = {
-            "Cement content": req.cement_content,
-            "W/C ratio": req.wc_ratio,
-            "SCM %": req.scm_pct,
-            "Ramp rate": req.ramp_rate,
-            "Hold temperature": req.hold_temperature,
-            "Ambient temperature": req.ambient_temperature,
-            "Maturity index": req.maturity_index,
-            "Mold availability": req.mold_availability,
-            "Energy tariff": req.energy_tariff
-        }
-        res = get_prediction(input_data)
+        input_data = req.to_input_data()
+        batcher = get_predict_batcher()
+        if batcher.enabled:
+            # Concurrent requests share one model call; the response is unchanged
+            res, model_version = await batcher.submit(input_data)
+        else:
+            res, model_version = await run_inference(get_prediction, input_data, True)
         metrics = {k: float(v) for k, v in res.items()}
         
-        insight_text = generate_ai_context(metrics, input_data)
+        # LLM insight is deferred; the template text is returned until it is ready
+        job = insight_jobs.submit(metrics, input_data)
         
         return {
             "metrics": metrics,
-            "insight": insight_text,
+            "insight": fallback_context(metrics),
+            "insight_id": job.id,
+            "model_version": model_version,
             "tracker_data": {
                 'categories': ['Strength variability', 'Climate dependency', 'Cost volatility', 'Mold idle risk', 'Schedule delay risk', 'Energy fluctuation risk', 'Quality compliance risk'],
                 'before': [18, 28, 15, 32, 25, 20, 16],
@@ -35,3 +42,59 @@ async def predict_ml(req: PredictionRequest):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/predict/batch")
+async def predict_batch(req: BatchPredictionRequest):
+    try:
+        from ml_model import get_predictions
+        results, model_version = await run_inference(get_predictions, [s.to_input_data() for s in req.scenarios], True)
+        return {
+            "count": len(results),
+            "model_version": model_version,
+            "metrics": [{k: float(v) for k, v in res.items()} for res in results]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _propagate(*args):
+    # Runs on the simulation pool: resolving the features may load the model
+    from ml_model import get_features, TARGETS
+    from api.services.uncertainty import propagate
+    return propagate(get_features(), TARGETS, *args)
+
+@router.post("/predict/uncertainty")
+async def predict_uncertainty(req: UncertaintyRequest):
+    unknown = [k for k in req.distributions if k not in FEATURE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown features in distributions: {unknown}")
+    if not 1 <= req.samples <= UNCERTAINTY_MAX_SAMPLES:
+        raise HTTPException(status_code=422, detail=f"samples must be between 1 and {UNCERTAINTY_MAX_SAMPLES}")
+    if any(not 0 <= q <= 100 for q in req.percentiles):
+        raise HTTPException(status_code=422, detail="percentiles must be between 0 and 100")
+    try:
+        from ml_model import get_prediction
+        input_data = req.base.to_input_data()
+        distributions = {FEATURE_FIELDS[k]: d.model_dump() for k, d in req.distributions.items()}
+        result = await run_simulation(
+            _propagate,
+            input_data,
+            distributions,
+            req.samples,
+            req.seed,
+            req.percentiles,
+            req.thresholds,
+            max(1, min(req.workers, UNCERTAINTY_MAX_WORKERS)),
+            timeout=UNCERTAINTY_TIMEOUT
+        )
+        point, model_version = await run_inference(get_prediction, input_data, True)
+        result['point_estimate'] = {k: float(v) for k, v in point.items()}
+        result['model_version'] = model_version
+        return result
+    except SimulationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Uncertainty run exceeded {UNCERTAINTY_TIMEOUT:g}s; use fewer samples")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
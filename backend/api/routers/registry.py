@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException
+from api.services.executor import run_inference
+
+router = APIRouter()
+
+@router.get("/models")
+async def list_models():
+    import ml_model
+    return ml_model.registry_status()
+
+@router.post("/models/reload")
+async def reload_models():
+    # Same check the background watcher runs, triggered on demand; also drops a rollback
+    # pin so every worker moves to the newest version
+    import ml_model
+    swapped = await run_inference(ml_model.reload_model, True)
+    return {"swapped": swapped, **ml_model.registry_status()}
+
+@router.post("/models/rollback")
+async def rollback_model():
+    import ml_model
+    if not ml_model.rollback():
+        raise HTTPException(status_code=409, detail="No previous model version to roll back to")
+    return ml_model.registry_status()
@@ -1,48 +1,58 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Header, Response
 from fastapi.responses import StreamingResponse
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-import io
-from api.models import ReportRequest
+from typing import Optional
+from api.models import ReportRequest, BulkReportRequest
+from api.services.report_renderer import get_report, report_key, stream_bulk_report
+from api.services.ai_service import fallback_context
+from api.services.executor import run_inference
 
 router = APIRouter()
 
 @router.post("/report")
-async def generate_report(req: ReportRequest):
+async def generate_report(req: ReportRequest, if_none_match: Optional[str] = Header(None)):
+    # The ETag is derived from the payload, so a matching client copy skips rendering
+    etag = f'"{report_key(req.metrics, req.insight)}"'
+    headers = {
+        "ETag": etag,
+        "Content-Disposition": "attachment; filename=LT_Precast_Optimization_Report.pdf"
+    }
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(',')]:
+        return Response(status_code=304, headers={"ETag": etag})
     try:
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        c.setFont("Helvetica-Bold", 18)
-        c.drawString(50, 750, "Precast Digital Chemist - L&T Executive Report")
-        
-        c.setFont("Helvetica", 12)
-        c.drawString(50, 700, "1. Current Scenario Outputs")
-        
-        y = 670
-        for key, val in req.metrics.items():
-            c.drawString(70, y, f"- {key}: {val}")
-            y -= 25
-            
-        c.drawString(50, y - 20, "2. Risk Mitigation Highlights")
-        c.drawString(70, y - 45, "- Strength variability reduced from 18% to 4%")
-        c.drawString(70, y - 70, "- Energy fluctuation risk reduced from 20% to 4%")
-        c.drawString(70, y - 95, "- Quality compliance risk reduced to 2% limit")
-        
-        c.drawString(50, y - 140, "3. AI Diagnostic Insights")
-        text_lines = req.insight.split('\n')
-        insight_y = y - 165
-        for line in text_lines:
-            c.drawString(70, insight_y, line.strip())
-            insight_y -= 15
-        
-        c.drawString(50, insight_y - 40, "Report generated automatically via AI Agent Engine.")
-        c.save()
-        
-        buffer.seek(0)
-        return StreamingResponse(
-            buffer, 
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=LT_Precast_Optimization_Report.pdf"}
-        )
+        pdf = await get_report(req.metrics, req.insight, etag.strip('"'))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Report rendering timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return Response(content=pdf, media_type="application/pdf", headers=headers)
+
+@router.post("/report/bulk")
+async def generate_bulk_report(req: BulkReportRequest):
+    if not req.scenarios:
+        raise HTTPException(status_code=422, detail="At least one scenario is required")
+    missing = [i for i, s in enumerate(req.scenarios) if s.metrics is None and s.inputs is None]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Scenarios need metrics or inputs: {missing}")
+    try:
+        from ml_model import get_predictions
+        # Scenarios given as inputs are scored together in one batch predict
+        to_score = [s.inputs.to_input_data() for s in req.scenarios if s.metrics is None]
+        scored = iter(await run_inference(get_predictions, to_score) if to_score else [])
+        scenarios = []
+        for i, s in enumerate(req.scenarios, start=1):
+            if s.metrics is not None:
+                metrics, insight = s.metrics, s.insight
+            else:
+                metrics = {k: round(float(v), 2) for k, v in next(scored).items()}
+                insight = s.insight or fallback_context(metrics)
+            scenarios.append({'name': s.name or f"Scenario {i}", 'metrics': metrics, 'insight': insight})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Pages are produced lazily as the client reads them, so memory stays flat
+    return StreamingResponse(
+        stream_bulk_report(scenarios, req.title),
+        media_type="application/pdf",
+        headers={"Content-Disposition": "attachment; filename=LT_Precast_Bulk_Report.pdf"}
+    )
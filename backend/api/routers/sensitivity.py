@@ -0,0 +1,48 @@
+import os
+from fastapi import APIRouter, HTTPException
+from api.models import SensitivityRequest, FEATURE_FIELDS
+from api.services.executor import run_inference
+from api.services.sensitivity import sensitivity_sweep
+
+router = APIRouter()
+
+SENSITIVITY_MAX_ROWS = int(os.environ.get('SENSITIVITY_MAX_ROWS', 200000))
+
+def _sweep(*args):
+    # Runs on the inference pool: resolving the features may load the model
+    from ml_model import predict_matrix, get_features, TARGETS
+    return sensitivity_sweep(predict_matrix, get_features(), TARGETS, *args)
+
+@router.post("/sensitivity")
+async def sensitivity(req: SensitivityRequest):
+    fields = req.features or list(FEATURE_FIELDS)
+    named = set(fields) | set(req.ranges) | {f for pair in req.pairs for f in pair}
+    unknown = sorted(f for f in named if f not in FEATURE_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown features: {unknown}")
+    if any(len(pair) != 2 or pair[0] == pair[1] for pair in req.pairs):
+        raise HTTPException(status_code=422, detail="Each pair must name two different features")
+    if any(len(r) != 2 for r in req.ranges.values()):
+        raise HTTPException(status_code=422, detail="Ranges must be [min, max]")
+    if not 2 <= req.points <= 500:
+        raise HTTPException(status_code=422, detail="points must be between 2 and 500")
+    rows = 1 + len(fields) * req.points + len(req.pairs) * req.points ** 2
+    if rows > SENSITIVITY_MAX_ROWS:
+        raise HTTPException(status_code=422, detail=f"Sweep needs {rows} evaluations (limit {SENSITIVITY_MAX_ROWS})")
+    try:
+        result = await run_inference(
+            _sweep,
+            req.base.to_input_data(),
+            [FEATURE_FIELDS[f] for f in fields],
+            {FEATURE_FIELDS[f]: r for f, r in req.ranges.items()},
+            req.points,
+            [(FEATURE_FIELDS[x], FEATURE_FIELDS[y]) for x, y in req.pairs]
+        )
+        # Report features with the same field names /predict accepts
+        to_field = {feature: field for field, feature in FEATURE_FIELDS.items()}
+        result['curves'] = {to_field[f]: curve for f, curve in result['curves'].items()}
+        for surface in result['surfaces']:
+            surface['x'], surface['y'] = to_field[surface['x']], to_field[surface['y']]
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,58 @@
+import os
+import asyncio
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from api.models import YardRequest, FEATURE_FIELDS
+from api.services.executor import run_simulation, SimulationBusy
+from api.services.yard import simulate_yard
+
+router = APIRouter()
+
+YARD_MAX_ELEMENTS = int(os.environ.get('YARD_MAX_ELEMENTS', 1000000))
+YARD_TIMEOUT = float(os.environ.get('YARD_TIMEOUT', 120))
+
+def _run(req):
+    from ml_model import predict_matrix, get_features, TARGETS
+    # One batched predict for every order's plan
+    features = get_features()
+    to_field = {feature: field for field, feature in FEATURE_FIELDS.items()}
+    X = np.array([[getattr(o.plan, to_field[f]) for f in features] for o in req.orders], dtype=np.float32)
+    demould = np.maximum(np.asarray(predict_matrix(X), dtype=np.float64)[:, TARGETS.index('Demould time')], 0.0)
+    result = simulate_yard(
+        [o.quantity for o in req.orders],
+        [o.due_hours for o in req.orders],
+        demould.tolist(),
+        req.molds,
+        req.crews,
+        req.cast_hours,
+        req.strip_hours,
+        req.shift_start_hour,
+        req.shift_hours,
+        req.horizon_days * 24.0
+    )
+    for order, summary, hours in zip(req.orders, result['orders'], demould):
+        summary['order_id'] = order.order_id
+        summary['demould_hours'] = round(float(hours), 2)
+    return result
+
+@router.post("/yard/simulate")
+async def simulate(req: YardRequest):
+    if not req.orders:
+        raise HTTPException(status_code=422, detail="At least one order is required")
+    if req.molds < 1 or req.crews < 1:
+        raise HTTPException(status_code=422, detail="molds and crews must be at least 1")
+    if req.cast_hours <= 0 or req.strip_hours < 0 or not 0 < req.shift_hours <= 24 or req.horizon_days <= 0:
+        raise HTTPException(status_code=422, detail="Need cast_hours > 0, strip_hours >= 0, 0 < shift_hours <= 24 and horizon_days > 0")
+    if any(o.quantity < 1 for o in req.orders):
+        raise HTTPException(status_code=422, detail="Order quantities must be at least 1")
+    elements = sum(o.quantity for o in req.orders)
+    if elements > YARD_MAX_ELEMENTS:
+        raise HTTPException(status_code=422, detail=f"Order book has {elements} elements (limit {YARD_MAX_ELEMENTS})")
+    try:
+        return await run_simulation(_run, req, timeout=YARD_TIMEOUT)
+    except SimulationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Yard simulation exceeded {YARD_TIMEOUT:g}s; shorten horizon_days or the order book")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
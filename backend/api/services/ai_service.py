@@ -1,13 +1,22 @@
-import os
-from google import genai
 from dotenv import load_dotenv
+from api.services.executor import run_llm
+from api.services.gemini_client import get_client, GEMINI_MODEL
+from api.services.insight_cache import insight_cache, cache_key
+from api.services.metrics import span
 
 load_dotenv()
 
-def generate_ai_context(prediction_results, inputs):
+async def generate_ai_context(prediction_results, inputs):
+    text = await generate_llm_context(prediction_results, inputs)
+    if text is not None:
+        return text
+    return fallback_context(prediction_results)
+
+async def generate_llm_context(prediction_results, inputs):
+    # Returns None when the LLM is not configured, slow or unavailable
     try:
-        if 'GEMINI_API_KEY' in os.environ and os.environ['GEMINI_API_KEY']:
-            client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
+        client = get_client()
+        if client is not None:
             prompt = f"""
             Analyze this concrete mix scenario for a precast plant.
             Inputs: {inputs}
@@ -15,14 +24,23 @@ def generate_ai_context(prediction_results, inputs):
             
             Give a 3-bullet point explanation of why this recipe is optimal and what the primary benefits are (e.g. cost savings, mold utilization). Keep it professional and short.
             """
-            response = client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt
-            )
+            key = cache_key(GEMINI_MODEL, prompt)
+            cached = await insight_cache.get(key)
+            if cached is not None:
+                return cached
+            with span('llm_call'):
+                response = await run_llm(client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=prompt
+                ))
+            if response.text:
+                insight_cache.put(key, GEMINI_MODEL, response.text)
             return response.text
     except Exception as e:
         pass
-    
+    return None
+
+def fallback_context(prediction_results):
     # Fallback to precise deterministic text
     return f"""
     Optimal Recipe Assessed
@@ -0,0 +1,80 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+from api.services.executor import run_inference
+from api.services.metrics import Histogram
+
+load_dotenv()
+
+# Coalesces concurrent single-row /predict calls into one batched model call. When no
+# batch is running a request is dispatched at once; otherwise it waits with the others
+# until PREDICT_BATCH_WINDOW_MS has passed or PREDICT_BATCH_MAX rows are queued.
+# A window of 0 disables batching.
+PREDICT_BATCH_WINDOW_MS = float(os.environ.get('PREDICT_BATCH_WINDOW_MS', 2))
+PREDICT_BATCH_MAX = int(os.environ.get('PREDICT_BATCH_MAX', 64))
+
+BATCH_SIZE = Histogram('predict_batch_size', 'Rows per coalesced /predict model call', (),
+                       buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+BATCH_QUEUE_DELAY = Histogram('predict_batch_queue_seconds', 'Time a /predict row waited for its batch to dispatch')
+
+class MicroBatcher:
+    def __init__(self, fn, max_batch=PREDICT_BATCH_MAX, window_ms=PREDICT_BATCH_WINDOW_MS):
+        # fn(items) -> (results, tag) runs on the inference pool; each caller gets (result, tag)
+        self.fn = fn
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    @property
+    def enabled(self):
+        return self.window > 0 and self.max_batch > 1
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch or not self._tasks:
+            # An idle model gets the row straight away; rows arriving while a batch
+            # is running collect for up to the window
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        now = time.perf_counter()
+        BATCH_SIZE.observe(len(batch))
+        for _, _, queued_at in batch:
+            BATCH_QUEUE_DELAY.observe(now - queued_at)
+        try:
+            results, tag = await run_inference(self.fn, [item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result((result, tag))
+
+_predict_batcher = None
+
+def get_predict_batcher():
+    global _predict_batcher
+    if _predict_batcher is None:
+        from ml_model import get_prediction_batch
+        _predict_batcher = MicroBatcher(get_prediction_batch)
+    return _predict_batcher
@@ -0,0 +1,141 @@
+import os
+import time
+import uuid
+import asyncio
+import weakref
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dotenv import load_dotenv
+from api.models import ChatMessage
+from api.services.executor import run_llm
+from api.services.gemini_client import get_client, GEMINI_MODEL
+
+load_dotenv()
+
+# Server-side chat history: only a sliding window of recent turns is sent upstream,
+# older turns are folded into a rolling summary once the token budget is exceeded.
+CHAT_TOKEN_BUDGET = int(os.environ.get('CHAT_TOKEN_BUDGET', 2000))
+CHAT_MIN_WINDOW = int(os.environ.get('CHAT_MIN_WINDOW', 2))
+CHAT_SUMMARY_MAX_CHARS = int(os.environ.get('CHAT_SUMMARY_MAX_CHARS', 2000))
+CHAT_MAX_SESSIONS = int(os.environ.get('CHAT_MAX_SESSIONS', 1000))
+CHAT_SESSION_TTL = float(os.environ.get('CHAT_SESSION_TTL', 3600))
+
+def estimate_tokens(text):
+    # Rough heuristic (~4 characters per token); good enough for budgeting
+    return len(text) // 4 + 1
+
+class ChatSession:
+    def __init__(self, session_id=None):
+        self.id = session_id or uuid.uuid4().hex
+        self.summary = ""
+        self.turns = []
+
+    def add(self, role, content):
+        self.turns.append(ChatMessage(role='user' if role == 'user' else 'model', content=content))
+
+    def copy(self):
+        draft = ChatSession(self.id)
+        draft.summary = self.summary
+        draft.turns = list(self.turns)
+        return draft
+
+    def window_tokens(self):
+        return estimate_tokens(self.summary) + sum(estimate_tokens(t.content) for t in self.turns)
+
+class SessionStore(ABC):
+    # Storage interface; swap in a Redis/DB backed store via set_session_store()
+    @abstractmethod
+    def get(self, session_id):
+        ...
+
+    @abstractmethod
+    def save(self, session):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id):
+        ...
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self, max_sessions=CHAT_MAX_SESSIONS, ttl=CHAT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def save(self, session):
+        with self._lock:
+            self._sessions[session.id] = (time.monotonic(), session)
+            self._sessions.move_to_end(session.id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+_store = InMemorySessionStore()
+
+def get_session_store():
+    return _store
+
+def set_session_store(store):
+    global _store
+    _store = store
+
+# One exchange at a time per session within an API worker process; a lock disappears
+# once no request holds or waits on it
+_locks = weakref.WeakValueDictionary()
+
+def session_lock(session_id):
+    lock = _locks.get(session_id)
+    if lock is None:
+        lock = _locks[session_id] = asyncio.Lock()
+    return lock
+
+async def compact(session, budget=None):
+    budget = budget or CHAT_TOKEN_BUDGET
+    dropped = []
+    while session.window_tokens() > budget and len(session.turns) > CHAT_MIN_WINDOW:
+        dropped.append(session.turns.pop(0))
+    # Gemini expects the window to open on a user turn
+    while len(session.turns) > 1 and session.turns[0].role != 'user':
+        dropped.append(session.turns.pop(0))
+    if dropped:
+        session.summary = await summarize(session.summary, dropped)
+    return session
+
+async def summarize(summary, turns):
+    transcript = "\n".join(f"{t.role}: {t.content}" for t in turns)
+    try:
+        client = get_client()
+        if client is not None:
+            prompt = f"""
+            Update the running summary of a conversation about the Precast Digital Chemist application.
+            Keep facts, numbers and user goals; drop pleasantries. Stay under {CHAT_SUMMARY_MAX_CHARS // 5} words.
+            Current summary: {summary or '(none)'}
+            New turns:
+            {transcript}
+            """
+            response = await run_llm(client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt
+            ))
+            if response.text:
+                return response.text.strip()[-CHAT_SUMMARY_MAX_CHARS:]
+    except Exception as e:
+        pass
+    # Fallback: keep the most recent text verbatim
+    return f"{summary}\n{transcript}".strip()[-CHAT_SUMMARY_MAX_CHARS:]
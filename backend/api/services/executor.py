@@ -0,0 +1,64 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from api.services.metrics import INFERENCE_IN_FLIGHT, LLM_IN_FLIGHT
+
+load_dotenv()
+
+# Blocking work (model inference) runs on a bounded thread pool so async
+# handlers never stall the event loop; LLM calls share a concurrency limit.
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 4))
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 10))
+# Long simulations (Monte Carlo, optimizer, curing and yard runs) get their own small pool so they can never
+# take the threads point predictions need; extra requests beyond the queue are refused
+SIMULATION_WORKERS = int(os.environ.get('SIMULATION_WORKERS', 2))
+SIMULATION_MAX_PENDING = int(os.environ.get('SIMULATION_MAX_PENDING', 4))
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 20))
+
+_inference_pool = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+_simulation_pool = ThreadPoolExecutor(max_workers=SIMULATION_WORKERS, thread_name_prefix="simulation")
+_simulation_pending = 0
+_llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+class SimulationBusy(RuntimeError):
+    pass
+
+async def run_inference(fn, *args):
+    loop = asyncio.get_running_loop()
+    with INFERENCE_IN_FLIGHT.track():
+        return await asyncio.wait_for(loop.run_in_executor(_inference_pool, fn, *args), INFERENCE_TIMEOUT)
+
+async def run_simulation(fn, *args, timeout):
+    # A timed-out simulation keeps its thread until it finishes, so it still counts as pending
+    global _simulation_pending
+    if _simulation_pending >= SIMULATION_MAX_PENDING:
+        raise SimulationBusy(f"Too many simulations running (limit {SIMULATION_MAX_PENDING}); retry later")
+    _simulation_pending += 1
+    future = asyncio.get_running_loop().run_in_executor(_simulation_pool, fn, *args)
+
+    def release(_):
+        global _simulation_pending
+        _simulation_pending -= 1
+
+    future.add_done_callback(release)
+    return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+async def run_llm(coro):
+    async with _llm_semaphore:
+        with LLM_IN_FLIGHT.track():
+            return await asyncio.wait_for(coro, LLM_TIMEOUT)
+
+async def stream_llm(stream_coro):
+    # Holds an LLM slot for the whole stream; the timeout applies per chunk
+    async with _llm_semaphore:
+        with LLM_IN_FLIGHT.track():
+            stream = await asyncio.wait_for(stream_coro, LLM_TIMEOUT)
+            iterator = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), LLM_TIMEOUT)
+                except StopAsyncIteration:
+                    return
+                yield chunk
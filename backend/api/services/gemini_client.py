@@ -0,0 +1,61 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# One process-wide Gemini client shared by the API routers and the Streamlit app,
+# backed by keep-alive httpx connection pools and SDK-level retry with backoff.
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash')
+GEMINI_BASE_URL = os.environ.get('GEMINI_BASE_URL')  # e.g. a local stub server
+GEMINI_POOL_SIZE = int(os.environ.get('GEMINI_POOL_SIZE', 16))
+GEMINI_KEEPALIVE_EXPIRY = float(os.environ.get('GEMINI_KEEPALIVE_EXPIRY', 60))
+GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 30))
+GEMINI_RETRY_ATTEMPTS = int(os.environ.get('GEMINI_RETRY_ATTEMPTS', 3))
+GEMINI_RETRY_INITIAL_DELAY = float(os.environ.get('GEMINI_RETRY_INITIAL_DELAY', 0.5))
+GEMINI_RETRY_MAX_DELAY = float(os.environ.get('GEMINI_RETRY_MAX_DELAY', 8))
+
+_client = None
+_client_key = None
+_lock = threading.Lock()
+
+def api_key():
+    return os.environ.get('GEMINI_API_KEY') or None
+
+def is_configured():
+    return api_key() is not None
+
+def get_client():
+    global _client, _client_key
+    key = api_key()
+    if key is None:
+        return None
+    with _lock:
+        if _client is None or _client_key != key:
+            _client = _build_client(key)
+            _client_key = key
+        return _client
+
+def _build_client(key):
+    # google-genai and httpx are heavy imports; only pay for them once a key is configured
+    import httpx
+    from google import genai
+    from google.genai import types
+    limits = httpx.Limits(
+        max_connections=GEMINI_POOL_SIZE,
+        max_keepalive_connections=GEMINI_POOL_SIZE,
+        keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(GEMINI_TIMEOUT)
+    http_options = types.HttpOptions(
+        base_url=GEMINI_BASE_URL,
+        timeout=int(GEMINI_TIMEOUT * 1000),
+        retry_options=types.HttpRetryOptions(
+            attempts=GEMINI_RETRY_ATTEMPTS,
+            initial_delay=GEMINI_RETRY_INITIAL_DELAY,
+            max_delay=GEMINI_RETRY_MAX_DELAY
+        ),
+        httpx_client=httpx.Client(limits=limits, timeout=timeout),
+        httpx_async_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+    )
+    return genai.Client(api_key=key, http_options=http_options)
@@ -0,0 +1,229 @@
+import os
+import re
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Content-addressed cache of LLM insight text keyed on sha256(model + normalized prompt).
+# Hot entries live in an in-memory LRU; INSIGHT_CACHE_DB adds a SQLite file so the
+# cache survives restarts. SQLite reads and batched writes run on a dedicated thread,
+# flushed by size and every INSIGHT_CACHE_FLUSH_SECONDS.
+INSIGHT_CACHE_SIZE = int(os.environ.get('INSIGHT_CACHE_SIZE', 4096))
+INSIGHT_CACHE_DB = os.environ.get('INSIGHT_CACHE_DB')
+INSIGHT_CACHE_DB_MAX_ROWS = int(os.environ.get('INSIGHT_CACHE_DB_MAX_ROWS', 100000))
+# SQLite writes (new entries and last_used refreshes) are batched and flushed on a
+# background thread once this many are queued or this many seconds have passed
+INSIGHT_CACHE_FLUSH_ROWS = int(os.environ.get('INSIGHT_CACHE_FLUSH_ROWS', 64))
+INSIGHT_CACHE_FLUSH_SECONDS = float(os.environ.get('INSIGHT_CACHE_FLUSH_SECONDS', 5))
+# Eviction trims the table to this fraction of the limit, so it runs once per batch of growth
+INSIGHT_CACHE_DB_TRIM = 0.9
+
+def cache_key(model, prompt):
+    normalized = re.sub(r"\s+", " ", prompt).strip()
+    return hashlib.sha256(f"{model}\n{normalized}".encode("utf-8")).hexdigest()
+
+class InsightCache:
+    def __init__(self, maxsize=INSIGHT_CACHE_SIZE, db_path=INSIGHT_CACHE_DB, db_max_rows=INSIGHT_CACHE_DB_MAX_ROWS):
+        self.maxsize = maxsize
+        self.db_max_rows = db_max_rows
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.db_path = db_path
+        # The SQLite connection and its thread are created on first use in the process
+        # that uses them (each gunicorn worker), never in a preloading master: SQLite
+        # connections must not cross a fork. Only the DB thread touches the connection.
+        self._db = None
+        self._io = None
+        self._pid = None
+        self._io_lock = threading.Lock()
+        self._flusher = None
+        # Queued writes: key -> (model, text, last_used) for new entries, key -> last_used for hits
+        self._pending = {}
+        self._touched = {}
+        self._flushing = False
+        self._flushed_at = time.monotonic()
+        # Upper bound on the row count; recounted only when it may exceed the limit
+        self._rows = 0
+
+    def start(self):
+        """Start the periodic flush on the running event loop (once per API worker)."""
+        if self.db_path and self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def get(self, key):
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._touch(key)
+                return text
+        if self.db_path:
+            row = await asyncio.get_running_loop().run_in_executor(self._executor(), self._load, key)
+            if row is not None:
+                with self._lock:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    self._touch(key)
+                return row[0]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, model, text):
+        # Never blocks: the SQLite write is queued for the next flush
+        with self._lock:
+            self._remember(key, text)
+            if self.db_path:
+                self._touched.pop(key, None)
+                self._pending[key] = (model, text, time.time())
+                self._schedule_flush()
+
+    def flush(self):
+        """Write queued entries now, blocking until done (used at shutdown)."""
+        if self.db_path:
+            self._executor().submit(self._flush).result()
+
+    def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        if self.db_path and self._io is not None and self._pid == os.getpid():
+            self.flush()
+            self._io.submit(self._close_connection).result()
+            self._io.shutdown(wait=True)
+            self._io = None
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'persistent': bool(self.db_path),
+                'pending_writes': len(self._pending) + len(self._touched),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+    def _touch(self, key):
+        # Called with the lock held; refreshes last_used in SQLite on the next flush
+        if self.db_path:
+            if key in self._pending:
+                model, text, _ = self._pending[key]
+                self._pending[key] = (model, text, time.time())
+            else:
+                self._touched[key] = time.time()
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        # Called with the lock held
+        due = (len(self._pending) + len(self._touched) >= INSIGHT_CACHE_FLUSH_ROWS
+               or time.monotonic() - self._flushed_at >= INSIGHT_CACHE_FLUSH_SECONDS)
+        if due:
+            self._submit_flush()
+
+    def _submit_flush(self):
+        # Called with the lock held
+        if not self._flushing:
+            self._flushing = True
+            self._executor().submit(self._flush)
+
+    async def _flush_periodically(self):
+        # Bounds how long a queued write can wait, however quiet the cache gets
+        while True:
+            await asyncio.sleep(INSIGHT_CACHE_FLUSH_SECONDS)
+            with self._lock:
+                if self._pending or self._touched:
+                    self._submit_flush()
+
+    def _executor(self):
+        with self._io_lock:
+            if self._io is None or self._pid != os.getpid():
+                # A pool inherited across fork has no thread; its connection is dropped, not reused
+                self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="insight-db")
+                self._pid = os.getpid()
+                self._db = None
+            return self._io
+
+    def _connection(self):
+        # Runs on the DB thread
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS insights "
+                "(key TEXT PRIMARY KEY, model TEXT, text TEXT, last_used REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS insights_last_used ON insights (last_used)")
+            self._db.commit()
+            self._rows = self._db.execute("SELECT COUNT(*) FROM insights").fetchone()[0]
+        return self._db
+
+    def _close_connection(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _load(self, key):
+        # Runs on the DB thread; entries still queued for writing are not in SQLite yet
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            return (pending[1],)
+        return self._connection().execute("SELECT text FROM insights WHERE key = ?", (key,)).fetchone()
+
+    def _flush(self):
+        # Runs on the DB thread: one transaction per batch
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            touched, self._touched = self._touched, {}
+            self._flushed_at = time.monotonic()
+        try:
+            if pending or touched:
+                db = self._connection()
+                with db:
+                    db.executemany(
+                        "INSERT OR REPLACE INTO insights (key, model, text, last_used) VALUES (?, ?, ?, ?)",
+                        [(key, model, text, used) for key, (model, text, used) in pending.items()]
+                    )
+                    db.executemany(
+                        "UPDATE insights SET last_used = ? WHERE key = ?",
+                        [(used, key) for key, used in touched.items()]
+                    )
+                self._rows += len(pending)
+                if self._rows > self.db_max_rows:
+                    self._evict()
+        finally:
+            with self._lock:
+                self._flushing = False
+
+    def _evict(self):
+        # Deletes the least recently used rows via the last_used index, down to the trim level
+        self._rows = self._db.execute("SELECT COUNT(*) FROM insights").fetchone()[0]
+        excess = self._rows - int(self.db_max_rows * INSIGHT_CACHE_DB_TRIM)
+        if self._rows > self.db_max_rows and excess > 0:
+            with self._db:
+                self._db.execute(
+                    "DELETE FROM insights WHERE key IN (SELECT key FROM insights ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+            self._rows -= excess
+
+    def _remember(self, key, text):
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+insight_cache = InsightCache()
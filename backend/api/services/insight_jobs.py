@@ -0,0 +1,88 @@
+import os
+import uuid
+import asyncio
+from collections import OrderedDict
+from dotenv import load_dotenv
+from api.services.ai_service import generate_llm_context, fallback_context
+
+load_dotenv()
+
+# /predict returns immediately with an insight ID; LLM insight text is produced
+# by a small pool of background workers and fetched via /insight/{id}.
+INSIGHT_WORKERS = int(os.environ.get('INSIGHT_WORKERS', 4))
+INSIGHT_QUEUE_SIZE = int(os.environ.get('INSIGHT_QUEUE_SIZE', 256))
+INSIGHT_MAX_JOBS = int(os.environ.get('INSIGHT_MAX_JOBS', 2048))
+
+_jobs = OrderedDict()
+_queue = None
+_workers = []
+
+class InsightJob:
+    def __init__(self, metrics, inputs):
+        self.id = uuid.uuid4().hex
+        self.metrics = metrics
+        self.inputs = inputs
+        self.status = "pending"
+        self.source = None
+        self.insight = None
+        self.done = asyncio.Event()
+
+    def finish(self, text):
+        if text is None:
+            self.insight = fallback_context(self.metrics)
+            self.source = "template"
+        else:
+            self.insight = text
+            self.source = "llm"
+        self.status = "ready"
+        self.done.set()
+
+    def to_dict(self):
+        return {
+            "insight_id": self.id,
+            "status": self.status,
+            "source": self.source,
+            "insight": self.insight
+        }
+
+async def start():
+    global _queue
+    _queue = asyncio.Queue(maxsize=INSIGHT_QUEUE_SIZE)
+    for _ in range(INSIGHT_WORKERS):
+        _workers.append(asyncio.create_task(_worker()))
+
+async def stop():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+def submit(metrics, inputs):
+    job = InsightJob(metrics, inputs)
+    _jobs[job.id] = job
+    while len(_jobs) > INSIGHT_MAX_JOBS:
+        _jobs.popitem(last=False)
+    try:
+        if _queue is None:
+            raise asyncio.QueueFull
+        _queue.put_nowait(job)
+    except asyncio.QueueFull:
+        # Workers are saturated (or not running): serve the template straight away
+        job.finish(None)
+    return job
+
+def queue_depth():
+    return _queue.qsize() if _queue is not None else 0
+
+def get_job(insight_id):
+    return _jobs.get(insight_id)
+
+async def _worker():
+    while True:
+        job = await _queue.get()
+        try:
+            text = await generate_llm_context(job.metrics, job.inputs)
+        except Exception:
+            text = None
+        job.finish(text)
+        _queue.task_done()
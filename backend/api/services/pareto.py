@@ -0,0 +1,157 @@
+import time
+import numpy as np
+from api.models import FEATURE_BOUNDS, UNCONTROLLABLE_FEATURES, PredictionRequest
+
+# NSGA-II style multi-objective search over the model features the plant controls;
+# site conditions stay at the base scenario's values. Every generation is scored with
+# one batched predict call on the multi-output model.
+
+# +1 = minimize, -1 = maximize
+OBJECTIVE_SENSE = {
+    'Strength gain rate': -1.0,
+    'Demould time': 1.0,
+    'Cost per element': 1.0,
+    'Energy consumption': 1.0,
+    'Mold utilization': -1.0,
+    'Risk of under-strength': 1.0
+}
+
+def non_dominated_ranks(F):
+    # F is (N, M) and minimized; dominates[i, j] means row i dominates row j
+    better_or_equal = (F[:, None, :] <= F[None, :, :]).all(axis=2)
+    strictly_better = (F[:, None, :] < F[None, :, :]).any(axis=2)
+    dominates = better_or_equal & strictly_better
+    counts = dominates.sum(axis=0)
+    ranks = np.full(len(F), -1)
+    front = 0
+    current = counts == 0
+    while current.any():
+        ranks[current] = front
+        counts = counts - dominates[current].sum(axis=0)
+        counts[ranks >= 0] = -1
+        current = counts == 0
+        front += 1
+    return ranks
+
+def crowding_distance(F, ranks):
+    distance = np.zeros(len(F))
+    for front in np.unique(ranks):
+        idx = np.where(ranks == front)[0]
+        if len(idx) <= 2:
+            distance[idx] = np.inf
+            continue
+        for m in range(F.shape[1]):
+            order = idx[np.argsort(F[idx, m])]
+            span = F[order[-1], m] - F[order[0], m]
+            distance[order[0]] = distance[order[-1]] = np.inf
+            if span > 0:
+                distance[order[1:-1]] += (F[order[2:], m] - F[order[:-2], m]) / span
+    return distance
+
+def _tournament(rng, ranks, distance, n):
+    a = rng.integers(0, len(ranks), n)
+    b = rng.integers(0, len(ranks), n)
+    a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (distance[a] > distance[b]))
+    return np.where(a_wins, a, b)
+
+def _sbx_crossover(rng, p1, p2, lo, hi, eta=15.0, prob=0.9):
+    u = rng.random(p1.shape)
+    beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta + 1)), (1 / (2 * (1 - u))) ** (1 / (eta + 1)))
+    c1 = 0.5 * ((1 + beta) * p1 + (1 - beta) * p2)
+    c2 = 0.5 * ((1 - beta) * p1 + (1 + beta) * p2)
+    keep = rng.random(len(p1)) > prob
+    c1[keep], c2[keep] = p1[keep], p2[keep]
+    return np.clip(np.vstack([c1, c2]), lo, hi)
+
+def _polynomial_mutation(rng, X, lo, hi, eta=20.0):
+    prob = 1.0 / X.shape[1]
+    u = rng.random(X.shape)
+    delta = np.where(u < 0.5, (2 * u) ** (1 / (eta + 1)) - 1, 1 - (2 * (1 - u)) ** (1 / (eta + 1)))
+    mutate = rng.random(X.shape) < prob
+    return np.clip(X + mutate * delta * (hi - lo), lo, hi)
+
+def pareto_search(predict_matrix, features, targets, bounds=None, objectives=None,
+                  population_size=100, generations=100, seed=42, base=None):
+    """
+    predict_matrix maps an (N, len(features)) array to (N, len(targets)) predictions.
+    bounds maps feature name -> (min, max); missing features use FEATURE_BOUNDS, except
+    UNCONTROLLABLE_FEATURES, which are pinned to base (feature name -> value, defaulting
+    to PredictionRequest's defaults) unless bounds names them explicitly.
+    Returns the non-dominated front of the final population.
+    """
+    objectives = objectives or ['Cost per element', 'Demould time', 'Risk of under-strength']
+    unknown = [o for o in objectives if o not in OBJECTIVE_SENSE]
+    if unknown:
+        raise ValueError(f"Unknown objectives: {unknown}")
+    if population_size < 4:
+        raise ValueError("population_size must be at least 4")
+    if generations < 0:
+        raise ValueError("generations must be >= 0")
+    for f, pair in (bounds or {}).items():
+        if len(pair) != 2 or pair[0] > pair[1]:
+            raise ValueError(f"Bounds for {f} must be a [min, max] pair with min <= max")
+    base = base or PredictionRequest().to_input_data()
+    merged = dict(FEATURE_BOUNDS)
+    merged.update({f: (base[f], base[f]) for f in UNCONTROLLABLE_FEATURES})
+    merged.update(bounds or {})
+    lo = np.array([merged[f][0] for f in features], dtype=np.float64)
+    hi = np.array([merged[f][1] for f in features], dtype=np.float64)
+    free = hi > lo
+    if not free.any():
+        raise ValueError("At least one feature needs min < max to search over")
+    obj_idx = [targets.index(o) for o in objectives]
+    sense = np.array([OBJECTIVE_SENSE[o] for o in objectives])
+
+    rng = np.random.default_rng(seed)
+    n = population_size + population_size % 2
+    evaluations = 0
+
+    def evaluate(Z):
+        nonlocal evaluations
+        X = np.tile(lo, (len(Z), 1))
+        X[:, free] = Z
+        preds = np.asarray(predict_matrix(X), dtype=np.float64)
+        evaluations += len(Z)
+        return X, preds, preds[:, obj_idx] * sense
+
+    start = time.perf_counter()
+    Z = rng.uniform(lo[free], hi[free], size=(n, int(free.sum())))
+    X, preds, F = evaluate(Z)
+    ranks = non_dominated_ranks(F)
+    distance = crowding_distance(F, ranks)
+
+    for _ in range(generations):
+        parents = _tournament(rng, ranks, distance, n)
+        p1, p2 = Z[parents[: n // 2]], Z[parents[n // 2:]]
+        children = _sbx_crossover(rng, p1, p2, lo[free], hi[free])
+        children = _polynomial_mutation(rng, children, lo[free], hi[free])
+        X_c, preds_c, F_c = evaluate(children)
+
+        # Elitist survival over parents + offspring
+        Z = np.vstack([Z, children])
+        X = np.vstack([X, X_c])
+        preds = np.vstack([preds, preds_c])
+        F = np.vstack([F, F_c])
+        ranks = non_dominated_ranks(F)
+        distance = crowding_distance(F, ranks)
+        survivors = np.lexsort((-distance, ranks))[:n]
+        Z, X, preds, F = Z[survivors], X[survivors], preds[survivors], F[survivors]
+        ranks, distance = ranks[survivors], distance[survivors]
+
+    front = np.where(ranks == 0)[0]
+    _, unique = np.unique(np.round(F[front], 6), axis=0, return_index=True)
+    front = front[np.sort(unique)]
+    front = front[np.argsort(F[front, 0])]
+    return {
+        'objectives': objectives,
+        'front': [
+            {
+                'inputs': {f: round(float(v), 3) for f, v in zip(features, X[i])},
+                'metrics': {t: round(float(v), 3) for t, v in zip(targets, preds[i])}
+            }
+            for i in front
+        ],
+        'evaluations': evaluations,
+        'generations': generations,
+        'elapsed_seconds': round(time.perf_counter() - start, 3)
+    }
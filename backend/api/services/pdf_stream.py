@@ -0,0 +1,204 @@
+import io
+import os
+import zlib
+import hashlib
+from array import array
+from functools import lru_cache
+
+# Minimal incremental PDF writer for large reports. ReportLab keeps every page in
+# memory until save(), so bulk reports write each page's objects as soon as it is
+# drawn and only keep byte offsets for the xref table (16 bytes per page). Pages expose
+# the small part of the ReportLab canvas API the report layout uses (setFont / drawString).
+#
+# Text uses embedded TrueType fonts addressed by glyph id (Identity-H), so any Unicode
+# text (the rupee sign included) renders, pages can be encoded independently in worker
+# processes, and each font is subset to the glyphs actually used once at the end.
+
+LETTER = (612, 792)
+REPORT_FONT = os.environ.get('REPORT_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+REPORT_FONT_BOLD = os.environ.get('REPORT_FONT_BOLD', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf')
+# Font name -> TrueType file; the report layout and ReportLab renders use the same names
+FONTS = {'ReportSans': REPORT_FONT, 'ReportSans-Bold': REPORT_FONT_BOLD}
+RESOURCES = {name: 'F%d' % (i + 1) for i, name in enumerate(FONTS)}
+
+# Reserved object numbers: catalog, page tree, then one Type0 font per font
+CATALOG_ID = 1
+PAGES_ID = 2
+FIRST_FREE_ID = 3 + len(FONTS)
+
+@lru_cache(maxsize=None)
+def glyph_map(path):
+    """Unicode code point -> glyph id for a TrueType file (cached per process)."""
+    from fontTools.ttLib import TTFont
+    font = TTFont(path, lazy=True)
+    gid = {name: i for i, name in enumerate(font.getGlyphOrder())}
+    return {cp: gid[name] for cp, name in font.getBestCmap().items()}
+
+def embed_font(path, gids):
+    """
+    Subset a TrueType file to gids, keeping glyph ids, and return what the PDF font
+    objects need: the compressed font program, widths and the ToUnicode mapping.
+    """
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+    font = TTFont(path)
+    scale = 1000.0 / font['head'].unitsPerEm
+    order = font.getGlyphOrder()
+    metrics = {
+        'ps_name': font['name'].getDebugName(6) or os.path.splitext(os.path.basename(path))[0],
+        'bbox': [round(v * scale) for v in (font['head'].xMin, font['head'].yMin, font['head'].xMax, font['head'].yMax)],
+        'ascent': round(font['hhea'].ascent * scale),
+        'descent': round(font['hhea'].descent * scale),
+        'cap_height': round(getattr(font.get('OS/2'), 'sCapHeight', font['hhea'].ascent) * scale),
+        'widths': {g: round(font['hmtx'][order[g]][0] * scale) for g in gids},
+        'unicode': {g: cp for cp, g in sorted(glyph_map(path).items(), reverse=True) if g in gids}
+    }
+    options = subset.Options()
+    options.retain_gids = True
+    options.notdef_outline = True
+    options.layout_features = []
+    options.drop_tables += ['FFTM']
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(gids=sorted(set(gids) | {0}))
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    font.save(buffer)
+    raw = buffer.getvalue()
+    metrics['length'] = len(raw)
+    metrics['file'] = zlib.compress(raw)
+    return metrics
+
+class PageCanvas:
+    def __init__(self):
+        self._ops = []
+        self._font = 'ReportSans'
+        self._size = 12
+        # Glyph ids drawn per font, for subsetting at the end of the document
+        self.glyphs = {name: set() for name in FONTS}
+
+    def setFont(self, name, size):
+        if name not in FONTS:
+            raise KeyError(f"Unknown report font {name!r}; available: {list(FONTS)}")
+        self._font = name
+        self._size = size
+
+    def drawString(self, x, y, text):
+        glyphs = glyph_map(FONTS[self._font])
+        gids = [glyphs.get(ord(ch), 0) for ch in str(text)]
+        self.glyphs[self._font].update(gids)
+        hex_text = ''.join('%04X' % g for g in gids).encode()
+        self._ops.append(b'BT /%s %g Tf %g %g Td <%s> Tj ET' % (RESOURCES[self._font].encode(), self._size, x, y, hex_text))
+
+    def content(self):
+        return b'\n'.join(self._ops)
+
+def render_page(draw, *args):
+    """Run draw(canvas, *args) on a fresh page; return its compressed content stream and glyphs used."""
+    canvas = PageCanvas()
+    draw(canvas, *args)
+    return zlib.compress(canvas.content()), {name: sorted(g) for name, g in canvas.glyphs.items() if g}
+
+class StreamingPDF:
+    def __init__(self, pagesize=LETTER):
+        self.pagesize = pagesize
+        self._offset = 0
+        # _offsets[n] is the byte offset of object n; every page adds a content + page object
+        self._offsets = array('Q', [0] * FIRST_FREE_ID)
+        self._pages = 0
+        # Union of glyph ids used per font; bounded by the font's glyph count
+        self.glyphs = {name: set() for name in FONTS}
+
+    def begin(self):
+        return self._emit(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def page(self, stream, glyphs):
+        """Frame one rendered page (see render_page) as PDF objects and return their bytes."""
+        for name, gids in glyphs.items():
+            self.glyphs[name].update(gids)
+        content_id, page_id = self._page_id(self._pages) - 1, self._page_id(self._pages)
+        self._pages += 1
+        return (
+            self._object(content_id, b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+            + self._object(page_id, b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %g %g] /Contents %d 0 R >>'
+                           % (PAGES_ID, self.pagesize[0], self.pagesize[1], content_id))
+        )
+
+    def used_fonts(self):
+        """(name, path, sorted glyph ids) for every font the pages drew with; feed each to embed_font."""
+        return [(name, FONTS[name], sorted(gids)) for name, gids in self.glyphs.items() if gids]
+
+    def end(self, embedded, chunk=1024):
+        """
+        Yield the fonts, page tree, catalog and xref table in pieces of `chunk` entries.
+        embedded maps font name to embed_font's result for every font in used_fonts().
+        """
+        next_id = self._page_id(self._pages) - 1
+        font_refs = []
+        for i, name in enumerate(FONTS):
+            font_refs.append(b'/%s %d 0 R' % (RESOURCES[name].encode(), 3 + i))
+            if name not in embedded:
+                continue
+            font = embedded[name]
+            cid_id, descriptor_id, file_id, unicode_id = range(next_id, next_id + 4)
+            next_id += 4
+            # Subset fonts are tagged with six capitals derived from the glyph set
+            tag = ''.join(chr(65 + b % 26) for b in hashlib.sha1(repr(sorted(font['widths'])).encode()).digest()[:6])
+            base = ('%s+%s' % (tag, font['ps_name'])).encode()
+            yield self._object(3 + i, b'<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H '
+                                      b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>' % (base, cid_id, unicode_id))
+            widths = b' '.join(b'%d [%d]' % (g, w) for g, w in sorted(font['widths'].items()))
+            yield self._object(cid_id, b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /%s '
+                                       b'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+                                       b'/FontDescriptor %d 0 R /CIDToGIDMap /Identity /W [%s] >>' % (base, descriptor_id, widths))
+            yield self._object(descriptor_id, b'<< /Type /FontDescriptor /FontName /%s /Flags 32 /FontBBox [%s] '
+                                              b'/ItalicAngle 0 /Ascent %d /Descent %d /CapHeight %d /StemV 80 /FontFile2 %d 0 R >>'
+                               % (base, ' '.join(map(str, font['bbox'])).encode(), font['ascent'], font['descent'],
+                                  font['cap_height'], file_id))
+            yield self._object(file_id, b'<< /Length %d /Length1 %d /Filter /FlateDecode >>\nstream\n%s\nendstream'
+                               % (len(font['file']), font['length'], font['file']))
+            yield self._object(unicode_id, self._to_unicode(font['unicode']))
+
+        self._offsets[PAGES_ID] = self._offset
+        yield self._emit(b'%d 0 obj\n<< /Type /Pages /Count %d /Resources << /Font << %s >> >> /Kids ['
+                         % (PAGES_ID, self._pages, b' '.join(font_refs)))
+        for start in range(0, self._pages, chunk):
+            pages = range(start, min(start + chunk, self._pages))
+            yield self._emit(b''.join(b'%d 0 R ' % self._page_id(p) for p in pages))
+        yield self._emit(b'] >>\nendobj\n')
+        yield self._object(CATALOG_ID, b'<< /Type /Catalog /Pages %d 0 R >>' % PAGES_ID)
+
+        xref_offset = self._offset
+        size = len(self._offsets)
+        yield self._emit(b'xref\n0 %d\n0000000000 65535 f \n' % size)
+        for start in range(1, size, chunk):
+            yield self._emit(b''.join(b'%010d 00000 n \n' % self._offsets[n] for n in range(start, min(start + chunk, size))))
+        yield self._emit(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (size, CATALOG_ID, xref_offset))
+
+    def _to_unicode(self, mapping):
+        # CMap for text extraction; bfchar blocks hold at most 100 entries each
+        entries = sorted(mapping.items())
+        blocks = []
+        for start in range(0, len(entries), 100):
+            block = entries[start:start + 100]
+            blocks.append(b'%d beginbfchar\n%s\nendbfchar' % (len(block), b'\n'.join(
+                b'<%04X> <%s>' % (g, chr(cp).encode('utf-16-be').hex().upper().encode()) for g, cp in block)))
+        cmap = (b'/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n'
+                b'/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n'
+                b'/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n'
+                b'1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n%s\n'
+                b'endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend' % b'\n'.join(blocks))
+        stream = zlib.compress(cmap)
+        return b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream)
+
+    def _page_id(self, index):
+        return FIRST_FREE_ID + 2 * index + 1
+
+    def _object(self, number, body):
+        while len(self._offsets) <= number:
+            self._offsets.append(0)
+        self._offsets[number] = self._offset
+        return self._emit(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+
+    def _emit(self, data):
+        self._offset += len(data)
+        return data
@@ -0,0 +1,101 @@
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Background batch-scoring jobs for /jobs/score. Jobs run one at a time (by default) on
+# a dedicated thread so they never compete with request inference; each job reports
+# its progress as chunks are written. Files are confined to SCORING_DIR.
+SCORING_DIR = os.environ.get('SCORING_DIR', 'data')
+SCORING_CONCURRENCY = int(os.environ.get('SCORING_CONCURRENCY', 1))
+SCORING_MAX_JOBS = int(os.environ.get('SCORING_MAX_JOBS', 100))
+# Upper bound on the scoring processes a single API job may start
+SCORING_MAX_WORKERS = int(os.environ.get('SCORING_MAX_WORKERS', min(4, os.cpu_count() or 1)))
+# Upper bound on rows per chunk; each in-flight chunk is held in memory as a DataFrame
+SCORING_MAX_CHUNKSIZE = int(os.environ.get('SCORING_MAX_CHUNKSIZE', 1000000))
+
+_jobs = OrderedDict()
+_runner = ThreadPoolExecutor(max_workers=SCORING_CONCURRENCY, thread_name_prefix="scoring")
+
+class ScoringJob:
+    def __init__(self, input_path, output_path, chunksize, workers):
+        self.id = uuid.uuid4().hex
+        self.input_path = input_path
+        self.output_path = output_path
+        self.chunksize = chunksize
+        self.workers = workers
+        self.status = "pending"
+        self.rows = 0
+        self.total_rows = None
+        self.error = None
+        self.result = None
+        self.started_at = None
+        self.finished_at = None
+
+    def run(self):
+        from batch_scoring import score_file
+        self.status = "running"
+        self.started_at = time.time()
+        try:
+            self.result = score_file(self.input_path, self.output_path, self.chunksize, self.workers, self._progress)
+            self.status = "done"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+        self.finished_at = time.time()
+
+    def _progress(self, rows, total):
+        self.rows = rows
+        self.total_rows = total
+
+    def to_dict(self):
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "input_path": os.path.relpath(self.input_path, SCORING_DIR),
+            "output_path": os.path.relpath(self.output_path, SCORING_DIR),
+            "rows": self.rows,
+            "total_rows": self.total_rows,
+            "progress": round(self.rows / self.total_rows, 4) if self.total_rows else None,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed else None,
+            "model_version": self.result['model_version'] if self.result else None,
+            "error": self.error
+        }
+
+def resolve_path(path):
+    root = os.path.realpath(SCORING_DIR)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Path must stay inside the scoring directory: {path}")
+    return resolved
+
+def submit(input_path, output_path=None, chunksize=50000, workers=1):
+    from batch_scoring import file_format
+    source = resolve_path(input_path)
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    if output_path is None:
+        stem, ext = os.path.splitext(input_path)
+        output_path = f"{stem}_scored{ext}"
+    target = resolve_path(output_path)
+    # Rejects unsupported extensions before the job is queued
+    file_format(source)
+    file_format(target)
+    if target == source:
+        raise ValueError("Output path must differ from the input path")
+
+    job = ScoringJob(source, target, max(1, min(chunksize, SCORING_MAX_CHUNKSIZE)), max(1, min(workers, SCORING_MAX_WORKERS)))
+    _jobs[job.id] = job
+    while len(_jobs) > SCORING_MAX_JOBS:
+        _jobs.popitem(last=False)
+    _runner.submit(job.run)
+    return job
+
+def get_job(job_id):
+    return _jobs.get(job_id)
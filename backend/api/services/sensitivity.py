@@ -0,0 +1,77 @@
+import time
+import numpy as np
+from api.models import FEATURE_BOUNDS
+
+# One-at-a-time and pairwise partial-dependence sweeps around a base scenario. Every
+# sweep is laid out as rows of one (N, n_features) array and scored with a single
+# batched predict call.
+
+def sweep_values(lo, hi, points):
+    return np.linspace(float(lo), float(hi), int(points))
+
+def sensitivity_sweep(predict_matrix, features, targets, base, swept, ranges=None, points=50, pairs=()):
+    """
+    base maps feature -> value. Each feature in swept gets a 1-D curve and each
+    (feature_x, feature_y) in pairs a 2-D surface, over ranges[feature] (min, max)
+    or FEATURE_BOUNDS. Returns the base prediction, the curves and the surfaces.
+    """
+    start = time.perf_counter()
+    ranges = ranges or {}
+    index = {f: i for i, f in enumerate(features)}
+    base_row = np.array([base[f] for f in features], dtype=np.float64)
+    grids = {}
+    for f in list(swept) + [f for pair in pairs for f in pair]:
+        grids[f] = sweep_values(*ranges.get(f, FEATURE_BOUNDS[f]), points)
+
+    # Row 0 is the base; then each curve, then each surface
+    blocks = [base_row[None, :]]
+    layout = []
+    for f in swept:
+        rows = np.repeat(base_row[None, :], len(grids[f]), axis=0)
+        rows[:, index[f]] = grids[f]
+        blocks.append(rows)
+        layout.append(('curve', f, len(rows)))
+    for fx, fy in pairs:
+        gx, gy = np.meshgrid(grids[fx], grids[fy], indexing='ij')
+        rows = np.repeat(base_row[None, :], gx.size, axis=0)
+        rows[:, index[fx]] = gx.ravel()
+        rows[:, index[fy]] = gy.ravel()
+        blocks.append(rows)
+        layout.append(('surface', (fx, fy), len(rows)))
+
+    X = np.vstack(blocks)
+    preds = np.asarray(predict_matrix(X), dtype=np.float64)
+
+    def by_target(block, shape=None):
+        return {t: np.round(block[:, i] if shape is None else block[:, i].reshape(shape), 4).tolist()
+                for i, t in enumerate(targets)}
+
+    curves, surfaces = {}, []
+    offset = 1
+    for kind, key, n in layout:
+        block = preds[offset:offset + n]
+        offset += n
+        if kind == 'curve':
+            curves[key] = {
+                'values': np.round(grids[key], 4).tolist(),
+                'metrics': by_target(block),
+                # Spread of each target over the sweep, for ranking feature influence
+                'impact': {t: round(float(np.ptp(block[:, i])), 4) for i, t in enumerate(targets)}
+            }
+        else:
+            fx, fy = key
+            surfaces.append({
+                'x': fx,
+                'y': fy,
+                'x_values': np.round(grids[fx], 4).tolist(),
+                'y_values': np.round(grids[fy], 4).tolist(),
+                'metrics': by_target(block, (len(grids[fx]), len(grids[fy])))
+            })
+
+    return {
+        'base': {t: round(float(v), 4) for t, v in zip(targets, preds[0])},
+        'curves': curves,
+        'surfaces': surfaces,
+        'evaluations': len(X),
+        'elapsed_seconds': round(time.perf_counter() - start, 4)
+    }
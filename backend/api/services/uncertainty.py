@@ -0,0 +1,195 @@
+import os
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from api.models import FEATURE_BOUNDS
+
+# Monte Carlo propagation of batch-to-batch input variation through the model.
+# Samples are drawn and scored chunk by chunk; each chunk is reduced to per-target
+# histograms, sums and exceedance counts that are folded into running totals as soon
+# as the chunk finishes, so memory depends on the chunk size and not on the sample
+# count. Every chunk has its own child seed and chunks are folded in order, which makes
+# results identical for any number of worker processes.
+MC_CHUNK_SIZE = int(os.environ.get('MC_CHUNK_SIZE', 65536))
+MC_BINS = int(os.environ.get('MC_BINS', 16384))
+# Uniform draws over the whole input support used to size the histograms
+MC_PROBE_SIZE = 4096
+
+DISTRIBUTIONS = ('normal', 'uniform', 'triangular')
+
+def _validate(base, distributions):
+    for feature, d in distributions.items():
+        if d['kind'] not in DISTRIBUTIONS:
+            raise ValueError(f"{feature}: unknown distribution '{d['kind']}' (use {', '.join(DISTRIBUTIONS)})")
+        if d['kind'] == 'normal' and not (d.get('std') or 0) > 0:
+            raise ValueError(f"{feature}: normal distribution needs std > 0")
+        if d['kind'] in ('uniform', 'triangular'):
+            if d.get('low') is None or d.get('high') is None or d['low'] >= d['high']:
+                raise ValueError(f"{feature}: {d['kind']} distribution needs low < high")
+        if d['kind'] == 'triangular':
+            mode = d['mode'] if d.get('mode') is not None else base[feature]
+            if not d['low'] <= mode <= d['high']:
+                raise ValueError(f"{feature}: triangular mode must lie within [low, high]")
+
+def draw_samples(rng, features, base, distributions, n):
+    X = np.tile(np.array([base[f] for f in features], dtype=np.float64), (n, 1))
+    for i, f in enumerate(features):
+        d = distributions.get(f)
+        if d is None:
+            continue
+        if d['kind'] == 'normal':
+            mean = d['mean'] if d.get('mean') is not None else base[f]
+            X[:, i] = rng.normal(mean, d['std'], n)
+        elif d['kind'] == 'uniform':
+            X[:, i] = rng.uniform(d['low'], d['high'], n)
+        else:
+            mode = d['mode'] if d.get('mode') is not None else base[f]
+            X[:, i] = rng.triangular(d['low'], mode, d['high'], n)
+        # Keep draws inside the range the model was built for (e.g. no negative W/C)
+        lo, hi = FEATURE_BOUNDS.get(f, (-np.inf, np.inf))
+        np.clip(X[:, i], lo, hi, out=X[:, i])
+    return X.astype(np.float32)
+
+def _support(feature, base, d):
+    # Range the draws can take: [low, high], or mean +/- 6 std, always inside FEATURE_BOUNDS
+    lo, hi = FEATURE_BOUNDS.get(feature, (-np.inf, np.inf))
+    if d['kind'] == 'normal':
+        mean = d['mean'] if d.get('mean') is not None else base[feature]
+        low, high = mean - 6 * d['std'], mean + 6 * d['std']
+    else:
+        low, high = d['low'], d['high']
+    return max(low, lo), min(high, hi)
+
+def _probe(rng, features, base, distributions):
+    # Every varied feature uniform over its support, plus the all-low and all-high corners
+    supports = {f: _support(f, base, d) for f, d in distributions.items()}
+    X = draw_samples(rng, features, base, {f: {'kind': 'uniform', 'low': lo, 'high': hi}
+                                          for f, (lo, hi) in supports.items() if lo < hi}, MC_PROBE_SIZE)
+    for corner in (0, 1):
+        row = [supports[f][corner] if f in supports else base[f] for f in features]
+        X = np.vstack([X, np.array(row, dtype=np.float32)])
+    return X
+
+def _reduce(preds, edges, thresholds):
+    # Per-target partial aggregates for one chunk
+    counts = np.stack([np.histogram(np.clip(preds[:, j], edges[j][0], edges[j][-1]), bins=edges[j])[0]
+                       for j in range(preds.shape[1])])
+    exceed = [[int((preds[:, j] > t).sum()) for t in thresholds[j]] for j in range(preds.shape[1])]
+    return {
+        'n': len(preds),
+        'counts': counts,
+        'sum': preds.sum(axis=0, dtype=np.float64),
+        'sumsq': np.square(preds, dtype=np.float64).sum(axis=0),
+        'min': preds.min(axis=0).astype(np.float64),
+        'max': preds.max(axis=0).astype(np.float64),
+        'exceed': exceed
+    }
+
+def _score_chunk(seed, n, features, base, distributions, edges, thresholds):
+    from ml_model import predict_matrix
+    rng = np.random.default_rng(seed)
+    X = draw_samples(rng, features, base, distributions, n)
+    return _reduce(np.asarray(predict_matrix(X), dtype=np.float64), edges, thresholds)
+
+def _init_worker():
+    import ml_model
+    ml_model.load_model()
+
+def _percentile(counts, edges, q):
+    # Linear interpolation inside the histogram bin that holds the q-th percentile
+    cumulative = np.cumsum(counts)
+    rank = q / 100.0 * cumulative[-1]
+    i = min(int(np.searchsorted(cumulative, rank, side='left')), len(counts) - 1)
+    below = cumulative[i - 1] if i > 0 else 0
+    frac = (rank - below) / counts[i] if counts[i] else 0.0
+    return float(edges[i] + frac * (edges[i + 1] - edges[i]))
+
+def propagate(features, targets, base, distributions, samples=10000, seed=42, percentiles=(5, 50, 95),
+              thresholds=None, workers=1, chunk_size=MC_CHUNK_SIZE):
+    """
+    distributions maps feature -> {'kind': 'normal'|'uniform'|'triangular', ...};
+    features without one stay at their base value. thresholds maps target -> list of
+    values for P(target > value). Percentiles come from MC_BINS-bin histograms and are
+    accurate to about one bin width; mean, std, min/max and exceedance are exact.
+    """
+    _validate(base, distributions)
+    thresholds = thresholds or {}
+    unknown = [t for t in thresholds if t not in targets]
+    if unknown:
+        raise ValueError(f"Unknown targets in thresholds: {unknown}")
+    target_thresholds = [list(thresholds.get(t, [])) for t in targets]
+
+    start = time.perf_counter()
+    sizes = [min(chunk_size, samples - s) for s in range(0, samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # Histogram range: outputs of the first chunk and of a uniform probe over the input
+    # support, widened on both sides. Samples beyond it still land in the end bins (so
+    # ranks stay right) and min/max stay exact; only a percentile that falls in an end
+    # bin is coarser, and it is clamped to the exact min/max.
+    from ml_model import predict_matrix
+    first = np.asarray(predict_matrix(draw_samples(np.random.default_rng(seeds[0]), features, base, distributions, sizes[0])),
+                       dtype=np.float64)
+    probe = np.asarray(predict_matrix(_probe(np.random.default_rng(seed), features, base, distributions)), dtype=np.float64)
+    lo = np.minimum(first.min(axis=0), probe.min(axis=0))
+    hi = np.maximum(first.max(axis=0), probe.max(axis=0))
+    span = np.maximum(hi - lo, 1e-6 * np.maximum(np.abs(hi), 1.0))
+    edges = [np.linspace(lo[j] - 0.25 * span[j], hi[j] + 0.25 * span[j], MC_BINS + 1) for j in range(len(targets))]
+
+    totals = _reduce(first, edges, target_thresholds)
+    del first, probe
+
+    def fold(part):
+        totals['n'] += part['n']
+        totals['counts'] += part['counts']
+        totals['sum'] += part['sum']
+        totals['sumsq'] += part['sumsq']
+        np.minimum(totals['min'], part['min'], out=totals['min'])
+        np.maximum(totals['max'], part['max'], out=totals['max'])
+        for j, row in enumerate(part['exceed']):
+            for k, count in enumerate(row):
+                totals['exceed'][j][k] += count
+
+    rest = ((seeds[k], sizes[k], features, base, distributions, edges, target_thresholds) for k in range(1, len(sizes)))
+    if workers > 1 and len(sizes) > 1:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(min(workers, len(sizes) - 1), mp_context=context, initializer=_init_worker) as pool:
+            # At most 2 * workers chunks in flight, folded in chunk order
+            pending = deque()
+            for args in rest:
+                pending.append(pool.submit(_score_chunk, *args))
+                if len(pending) >= 2 * workers:
+                    fold(pending.popleft().result())
+            while pending:
+                fold(pending.popleft().result())
+    else:
+        for args in rest:
+            fold(_score_chunk(*args))
+
+    n = totals['n']
+    counts = totals['counts']
+    mean = totals['sum'] / n
+    std = np.sqrt(np.maximum(totals['sumsq'] / n - mean ** 2, 0.0))
+    mins, maxs = totals['min'], totals['max']
+
+    outputs = {}
+    for j, target in enumerate(targets):
+        exceed = totals['exceed'][j]
+        outputs[target] = {
+            'mean': round(float(mean[j]), 4),
+            'std': round(float(std[j]), 4),
+            'min': round(float(mins[j]), 4),
+            'max': round(float(maxs[j]), 4),
+            'percentiles': {f"p{q:g}": round(min(max(_percentile(counts[j], edges[j], q), mins[j]), maxs[j]), 4)
+                            for q in percentiles},
+            'exceedance': {f"{t:g}": round(c / n, 6) for t, c in zip(target_thresholds[j], exceed)}
+        }
+    return {
+        'samples': n,
+        'seed': seed,
+        'chunks': len(sizes),
+        'outputs': outputs,
+        'elapsed_seconds': round(time.perf_counter() - start, 3)
+    }
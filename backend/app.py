@@ -3,14 +3,16 @@ import plotly.express as px
 import pandas as pd
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-import os
-from google import genai
 from dotenv import load_dotenv
+from api.services.gemini_client import get_client, GEMINI_MODEL
 
 load_dotenv()
 
 try:
-    from ml_model import get_prediction
+    from ml_model import get_prediction, predict_matrix, get_features, TARGETS
+    from api.services.sensitivity import sensitivity_sweep
+    from api.models import FEATURE_FIELDS, UNCONTROLLABLE_FEATURES
+    from api.services.curing import plan_schedules, simulate_curing, REQUIRED_DEMOULD_STRENGTH
 except ImportError:
     st.error("Missing ml_model.py")
 
@@ -20,8 +22,8 @@ except ImportError:
 # Mock prompt for Gemini AI if no key is provided
 def generate_ai_context(prediction_results, inputs):
     try:
-        if 'GEMINI_API_KEY' in os.environ and os.environ['GEMINI_API_KEY']:
-            client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
+        client = get_client()
+        if client is not None:
             prompt = f"""
             Analyze this concrete mix scenario for a precast plant.
             Inputs: {inputs}
@@ -30,7 +32,7 @@ def generate_ai_context(prediction_results, inputs):
             Give a 3-bullet point explanation of why this recipe is optimal and what the primary benefits are (e.g. cost savings, mold utilization). Keep it professional and short.
             """
             response = client.models.generate_content(
-                model='gemini-2.5-flash',
+                model=GEMINI_MODEL,
                 contents=prompt
             )
             return response.text
@@ -89,27 +91,42 @@ inputs = {
 # ==========================================
 # 3. Generating Results Matrix
 # ==========================================
-baseline_inputs = [
-    ('Cement: 400kg', {'Cement content': 400, 'W/C ratio': 0.42, 'SCM %': 25, 'Ramp rate': 20, 'Hold temperature': 65, 'Ambient temperature': 32, 'Maturity index': 550, 'Mold availability': 85, 'Energy tariff': 7}),
-    ('W/C: 0.42', {'Cement content': 400, 'W/C ratio': 0.42, 'SCM %': 25, 'Ramp rate': 20, 'Hold temperature': 65, 'Ambient temperature': 32, 'Maturity index': 550, 'Mold availability': 85, 'Energy tariff': 7}),
-    ('SCM: 25%', {'Cement content': 400, 'W/C ratio': 0.42, 'SCM %': 25, 'Ramp rate': 20, 'Hold temperature': 65, 'Ambient temperature': 32, 'Maturity index': 550, 'Mold availability': 85, 'Energy tariff': 7}),
-    ('Hold: 65°C', {'Cement content': 400, 'W/C ratio': 0.42, 'SCM %': 25, 'Ramp rate': 20, 'Hold temperature': 65, 'Ambient temperature': 32, 'Maturity index': 550, 'Mold availability': 85, 'Energy tariff': 7}),
-    ('Ambient: 32°C', {'Cement content': 400, 'W/C ratio': 0.42, 'SCM %': 25, 'Ramp rate': 20, 'Hold temperature': 65, 'Ambient temperature': 32, 'Maturity index': 550, 'Mold availability': 85, 'Energy tariff': 7}),
-    ('Maturity: 550', {'Cement content': 400, 'W/C ratio': 0.42, 'SCM %': 25, 'Ramp rate': 20, 'Hold temperature': 65, 'Ambient temperature': 32, 'Maturity index': 550, 'Mold availability': 85, 'Energy tariff': 7}),
-]
+# One-knob tweaks around the current scenario: for each feature, the swept value with the
+# lowest cost that does not raise under-strength risk. All sweeps are one batch predict.
+# Only knobs the plant controls are recommended; site conditions stay as entered.
+# Feature -> (short label, value format) for the matrix rows
+knob_formats = {
+    'Cement content': ('Cement', '{:.0f}kg'),
+    'W/C ratio': ('W/C', '{:.2f}'),
+    'SCM %': ('SCM', '{:.0f}%'),
+    'Ramp rate': ('Ramp', '{:.0f}°C/hr'),
+    'Hold temperature': ('Hold', '{:.0f}°C'),
+    'Ambient temperature': ('Ambient', '{:.0f}°C'),
+    'Maturity index': ('Maturity', '{:.0f}'),
+    'Mold availability': ('Molds', '{:.0f}%'),
+    'Energy tariff': ('Tariff', '₹{:.1f}/kWh'),
+}
+optimized_knobs = [feature for feature in FEATURE_FIELDS.values() if feature not in UNCONTROLLABLE_FEATURES]
+sweep = sensitivity_sweep(predict_matrix, get_features(), TARGETS, inputs, optimized_knobs, points=25)
 
 # Build prediction grid for the UI matrix
 matrix_data = []
-for label, scenario_input in baseline_inputs:
-    pred = get_prediction(scenario_input)
+for feature in optimized_knobs:
+    label, fmt = knob_formats[feature]
+    curve = sweep['curves'][feature]
+    risk = curve['metrics']['Risk of under-strength']
+    cost = curve['metrics']['Cost per element']
+    safe = [i for i, r in enumerate(risk) if r <= sweep['base']['Risk of under-strength']]
+    best = min(safe, key=lambda i: cost[i]) if safe else min(range(len(risk)), key=lambda i: risk[i])
+    pred = {t: curve['metrics'][t][best] for t in TARGETS}
     matrix_data.append({
-        'INPUT': label,
-        'Strength Rate (MPa/hr)': pred['Strength gain rate'],
-        'Demould (hrs)': pred['Demould time'],
-        'Cost/Element (₹)': pred['Cost per element'],
-        'Energy (kWh)': pred['Energy consumption'],
-        'Mold Util (%)': pred['Mold utilization'],
-        'Under-Strength Risk (%)': pred['Risk of under-strength']
+        'INPUT': f"{label}: {fmt.format(curve['values'][best])}",
+        'Strength Rate (MPa/hr)': round(pred['Strength gain rate'], 2),
+        'Demould (hrs)': round(pred['Demould time'], 1),
+        'Cost/Element (₹)': round(pred['Cost per element'], 0),
+        'Energy (kWh)': round(pred['Energy consumption'], 0),
+        'Mold Util (%)': round(pred['Mold utilization'], 1),
+        'Under-Strength Risk (%)': round(pred['Risk of under-strength'], 2)
     })
 
 results_df = pd.DataFrame(matrix_data)
@@ -140,6 +157,34 @@ with col2:
     st.markdown(llm_text)
 
 
+# ==========================================
+# 4b. Curing Simulation Cross-check
+# ==========================================
+st.divider()
+st.header("🌡️ Simulated Strength Development")
+
+# Hold at temperature for the model's demould time and check it against the maturity simulation
+curing = simulate_curing(plan_schedules([inputs], [current_pred['Demould time']]), horizon_hours=max(48.0, 2 * current_pred['Demould time']))
+curing_df = pd.DataFrame({
+    'Hours': curing['times'],
+    'Strength (MPa)': curing['strength'][0],
+    'Temperature (°C)': curing['temperature'][0]
+})
+sim_demould = curing['demould_time'][0]
+c1, c2, c3 = st.columns(3)
+c1.metric("Model demould (hrs)", f"{current_pred['Demould time']:.1f}")
+c2.metric("Simulated demould (hrs)", "not reached" if sim_demould != sim_demould else f"{sim_demould:.1f}")
+c3.metric("Maturity at demould (°C·h)", "-" if sim_demould != sim_demould else f"{curing['maturity_at_demould'][0]:.0f}")
+
+fig = px.line(curing_df, x='Hours', y=['Strength (MPa)', 'Temperature (°C)'],
+              title=f"Current scenario vs {REQUIRED_DEMOULD_STRENGTH:g} MPa demould requirement",
+              color_discrete_sequence=['#2563eb', '#f59e0b'])
+fig.add_hline(y=REQUIRED_DEMOULD_STRENGTH, line_dash='dash', line_color='#ef4444')
+if sim_demould == sim_demould:
+    fig.add_vline(x=sim_demould, line_dash='dot', line_color='#10b981')
+fig.update_layout(yaxis_title="", legend_title="")
+st.plotly_chart(fig, use_container_width=True)
+
 # ==========================================
 # 5. Risk Reduction Module
 # ==========================================
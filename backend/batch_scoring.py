@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import argparse
+import warnings
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings("ignore")
+
+# Offline scoring of historical casting records. The input CSV or Parquet file is read
+# in fixed-size chunks, each chunk is mapped onto the model feature order and scored
+# with one batch predict, and predictions are appended to the output file before the
+# next chunk is read, so memory depends on the chunk size and never on the file size.
+# Every chunk gets the same column types (fixed up front, not inferred per chunk) so a
+# Parquet output never sees a schema change mid-file. Parquet support needs pyarrow.
+
+DEFAULT_CHUNKSIZE = 50000
+
+def file_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    if ext in ('.csv', '.txt'):
+        return 'csv'
+    raise ValueError(f"Unsupported file type '{ext}' (use .csv or .parquet)")
+
+def count_rows(path):
+    # Cheap first pass so progress can be reported as a fraction
+    if file_format(path) == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    # Header line out, unterminated last line in
+    return max(lines - 1 + (last != b'\n'), 0)
+
+def read_columns(path):
+    if file_format(path) == 'parquet':
+        import pyarrow.parquet as pq
+        return list(pq.ParquetFile(path).schema_arrow.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def csv_dtypes(columns, feature_cols):
+    # Per-chunk inference would flip types between chunks (int -> float once a decimal
+    # shows up, an empty column -> text later), so features are read as floats and
+    # every other column as nullable text
+    return {c: 'float64' if c in feature_cols else 'string' for c in columns}
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE, dtype=None):
+    if file_format(path) == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=dtype)
+
+def output_schema(path):
+    # Parquet input: the input file's own types plus the float32 predictions; chunks are
+    # cast back to it (e.g. an int column that pandas turned into float for a null)
+    if file_format(path) != 'parquet':
+        return None
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import ml_model
+    schema = pq.ParquetFile(path).schema_arrow.remove_metadata()
+    for target in ml_model.TARGETS:
+        # Re-scoring a scored file overwrites its prediction columns
+        field = pa.field(target, pa.float32())
+        index = schema.get_field_index(target)
+        schema = schema.set(index, field) if index >= 0 else schema.append(field)
+    return schema
+
+def feature_columns(columns, features):
+    """
+    Map each model feature to an input column. Columns may use the model feature names
+    or the API field names (cement_content, wc_ratio, ...), matched case-insensitively.
+    """
+    from api.models import FEATURE_FIELDS
+    aliases = {field: feature for field, feature in FEATURE_FIELDS.items()}
+    lookup = {}
+    for column in columns:
+        name = str(column).strip()
+        feature = aliases.get(name.lower(), name)
+        lookup.setdefault(feature.lower(), column)
+    missing = [f for f in features if f.lower() not in lookup]
+    if missing:
+        raise ValueError(f"Input is missing feature columns: {missing}")
+    return [lookup[f.lower()] for f in features]
+
+def score_chunk(df, columns):
+    import ml_model
+    X = df[columns].to_numpy(dtype=np.float32)
+    preds = ml_model.predict_matrix(X)
+    out = df.copy()
+    for i, target in enumerate(ml_model.TARGETS):
+        out[target] = preds[:, i]
+    return out
+
+class ChunkWriter:
+    # Appends scored chunks to a CSV (header once) or a Parquet file (one row group per
+    # chunk). Parquet chunks are cast to schema, or to the first chunk's schema.
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.format = file_format(path)
+        self.schema = schema
+        self._parquet = None
+        self._started = False
+
+    def write(self, df):
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            if self._parquet is None:
+                self.schema = table.schema
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+    def discard(self):
+        # Never leave a truncated output behind after a failure
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def _init_worker():
+    import ml_model
+    ml_model.load_model()
+
+def score_file(input_path, output_path, chunksize=DEFAULT_CHUNKSIZE, workers=1, progress=None):
+    """
+    Score input_path into output_path chunk by chunk. With workers > 1, chunks are
+    scored in a process pool with at most 2 * workers chunks in flight; output order
+    always matches input order. progress(rows_done, total_rows) is called per chunk.
+    """
+    import ml_model
+    features = ml_model.get_features()
+    total = count_rows(input_path)
+    all_columns = read_columns(input_path)
+    columns = feature_columns(all_columns, features)
+    dtype = csv_dtypes(all_columns, columns) if file_format(input_path) == 'csv' else None
+    writer = ChunkWriter(output_path, output_schema(input_path) if file_format(output_path) == 'parquet' else None)
+    rows = 0
+    start = time.perf_counter()
+    if progress:
+        progress(0, total)
+
+    def done(scored):
+        nonlocal rows
+        writer.write(scored)
+        rows += len(scored)
+        if progress:
+            progress(rows, total)
+
+    try:
+        if workers > 1:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+                pending = deque()
+                for chunk in iter_chunks(input_path, chunksize, dtype):
+                    pending.append(pool.submit(score_chunk, chunk, columns))
+                    if len(pending) >= 2 * workers:
+                        done(pending.popleft().result())
+                while pending:
+                    done(pending.popleft().result())
+        else:
+            for chunk in iter_chunks(input_path, chunksize, dtype):
+                done(score_chunk(chunk, columns))
+    except BaseException:
+        writer.discard()
+        raise
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'input_path': input_path,
+        'output_path': output_path,
+        'rows': rows,
+        'model_version': ml_model.get_active().version,
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed else None
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of casting records with the production model")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--workers', type=int, default=1, help="processes used to score chunks")
+    args = parser.parse_args()
+
+    def report(rows, total):
+        pct = f"{rows / total:6.1%}" if total else ""
+        print(f"\r  {rows:,} / {total:,} rows {pct}", end="", file=sys.stderr, flush=True)
+
+    summary = score_file(args.input, args.output, args.chunksize, args.workers, report)
+    print(file=sys.stderr)
+    print(f"Scored {summary['rows']:,} rows into {summary['output_path']} in {summary['elapsed_seconds']}s "
+          f"({summary['rows_per_second']:,} rows/s, model {summary['model_version']})")
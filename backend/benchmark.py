@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import warnings
+import multiprocessing as mp
+
+warnings.filterwarnings("ignore")
+
+
+def time_per_call(fn, arg, n=300):
+    fn(arg)  # warm-up
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(arg)
+    return (time.perf_counter() - start) / n * 1e6
+
+def bench_single_prediction():
+    from ml_model import get_prediction, get_prediction_legacy, _predict_one, prediction_cache, TEST_INPUT
+    assert get_prediction(TEST_INPUT) == get_prediction_legacy(TEST_INPUT)
+    before = time_per_call(get_prediction_legacy, TEST_INPUT)
+    after = time_per_call(_predict_one, TEST_INPUT)
+    cached = time_per_call(get_prediction, TEST_INPUT)
+    print("--- get_prediction per-call latency ---")
+    print(f"  pandas path (before) : {before:,.0f} us")
+    print(f"  numpy fast path      : {after:,.0f} us")
+    print(f"  speed-up             : {before / after:.1f}x")
+    print(f"  cache hit            : {cached:,.1f} us  {prediction_cache.stats()}")
+
+def bench_optimizer():
+    import ai_model
+    if not os.path.exists(ai_model.DATA_PATH):
+        print(f"Skipping optimizer benchmark: {ai_model.DATA_PATH} not found")
+        return
+    ai_model.get_strength_model()
+    print("--- differential evolution time-to-optimum ---")
+    runs = [
+        ("serial single-row", dict(vectorized=False, workers=1)),
+        ("process pool (-1)", dict(vectorized=False, workers=-1)),
+        ("vectorized batch", dict(vectorized=True))
+    ]
+    for label, options in runs:
+        res = ai_model.optimize_recipe(**options)
+        print(f"  {label:<20}: {res['elapsed_seconds']:>7.2f} s  cost={res['cost']:,.0f}  evals={res['evaluations']}")
+
+def bench_predict_batching(requests=512, concurrency=(1, 8, 64, 256)):
+    # Concurrent single-row /predict calls with and without the micro-batcher (cache off)
+    import asyncio
+    import numpy as np
+    import ml_model
+    from api.services.executor import run_inference
+    from api.services.batcher import MicroBatcher, BATCH_SIZE
+    ml_model.prediction_cache.maxsize = 0
+    rng = np.random.default_rng(0)
+    base = ml_model.TEST_INPUT
+    inputs = [{f: float(v) * base[f] for f, v in zip(base, rng.uniform(0.9, 1.1, len(base)))}
+              for _ in range(requests)]
+
+    async def run(call, limit):
+        gate = asyncio.Semaphore(limit)
+        async def one(item):
+            async with gate:
+                return await call(item)
+        start = time.perf_counter()
+        await asyncio.gather(*(one(item) for item in inputs))
+        return requests / (time.perf_counter() - start)
+
+    async def main():
+        await run_inference(ml_model.load_model)
+        batcher = MicroBatcher(ml_model.get_prediction_batch)
+        print("--- /predict throughput, concurrent single-row calls (req/s) ---")
+        for limit in concurrency:
+            direct = await run(lambda item: run_inference(ml_model.get_prediction, item, True), limit)
+            batched = await run(batcher.submit, limit)
+            print(f"  concurrency {limit:>3}: direct {direct:>8,.0f}   batched {batched:>8,.0f}   {batched / direct:.1f}x")
+        sizes = BATCH_SIZE._values.get((), [[0], 0])[0]
+        print(f"  batches dispatched   : {sum(sizes)}  (mean {requests * len(concurrency) / max(sum(sizes), 1):.1f} rows)")
+
+    asyncio.run(main())
+
+def memory_usage_mb():
+    # Rss counts shared pages in full; Pss splits them between the processes sharing them
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss'):
+                    usage[key.lower()] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        usage['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return usage
+
+def _memory_worker(results, done):
+    import ml_model
+    ml_model.load_model()
+    ml_model._predict_one(ml_model.TEST_INPUT)
+    results.put(memory_usage_mb())
+    done.wait()
+
+def _memory_master(mode, n_workers, out):
+    # 'shared': load once, then fork (gunicorn preload_app); 'private': every worker loads its own copy
+    if mode == 'shared':
+        import ml_model
+        ml_model.load_model(smoke_test=False)
+    ctx = mp.get_context('fork' if mode == 'shared' else 'spawn')
+    results, done = ctx.Queue(), ctx.Event()
+    workers = [ctx.Process(target=_memory_worker, args=(results, done)) for _ in range(n_workers)]
+    for w in workers:
+        w.start()
+    usage = [results.get() for _ in workers]
+    done.set()
+    for w in workers:
+        w.join()
+    out.put(usage)
+
+def bench_worker_memory(counts=(1, 4, 16)):
+    print("--- memory per worker (MB) ---")
+    ctx = mp.get_context('spawn')
+    for mode in ('private', 'shared'):
+        for n in counts:
+            out = ctx.Queue()
+            master = ctx.Process(target=_memory_master, args=(mode, n, out))
+            master.start()
+            usage = out.get()
+            master.join()
+            rss = sum(u['rss'] for u in usage) / n
+            pss = sum(u.get('pss', u['rss']) for u in usage) / n
+            print(f"  {mode:<8} {n:>2} workers: RSS {rss:7.1f}  PSS {pss:7.1f}  total PSS {pss * n:8.1f}")
+
+def bench_cold_start():
+    # Fresh interpreters: time `import main` and list the slowest top-level imports
+    import subprocess
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    runs = [float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout) for _ in range(3)]
+    print("--- API cold start ---")
+    print(f"  import main          : {min(runs) * 1000:,.0f} ms (best of 3)")
+    profile = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True).stderr
+    rows = []
+    for line in profile.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2][1:]
+        if not name.startswith(' '):
+            rows.append((int(parts[1]), name))
+    for cumulative_us, name in sorted(rows, reverse=True)[:5]:
+        print(f"  {name:<20} : {cumulative_us / 1000:,.0f} ms")
+
+if __name__ == "__main__":
+    if 'memory' in sys.argv[1:]:
+        bench_worker_memory()
+    elif 'coldstart' in sys.argv[1:]:
+        bench_cold_start()
+    elif 'batching' in sys.argv[1:]:
+        bench_predict_batching()
+    else:
+        bench_single_prediction()
+        bench_optimizer()
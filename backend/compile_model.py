@@ -0,0 +1,93 @@
+import os
+import sys
+import copy
+import time
+import argparse
+import warnings
+import numpy as np
+import joblib
+
+warnings.filterwarnings("ignore")
+
+# Offline conversion of the multi-output XGBoost pickle into a single ONNX graph that
+# ml_model serves through onnxruntime when MODEL_BACKEND=onnx. Needs the optional
+# packages onnxruntime, onnxmltools and skl2onnx. The graph is written next to the
+# pickle (precast_multi_model.onnx) and checked against it before it is kept.
+
+def export_onnx(model, n_features, out_path):
+    from skl2onnx import convert_sklearn, update_registered_converter
+    from skl2onnx.common.data_types import FloatTensorType
+    from skl2onnx.common.shape_calculator import calculate_linear_regressor_output_shapes
+    from onnxmltools.convert.xgboost.operator_converters.XGBoost import convert_xgboost
+    from xgboost import XGBRegressor
+
+    update_registered_converter(XGBRegressor, 'XGBoostXGBRegressor',
+                                calculate_linear_regressor_output_shapes, convert_xgboost)
+    # The converter only understands positional feature names (f0, f1, ...)
+    model = copy.deepcopy(model)
+    for est in model.estimators_:
+        est.get_booster().feature_names = None
+    onx = convert_sklearn(model, initial_types=[('input', FloatTensorType([None, n_features]))],
+                          target_opset={'': 17, 'ai.onnx.ml': 3})
+    with open(out_path, 'wb') as f:
+        f.write(onx.SerializeToString())
+
+def parity_samples(features, n=10000, seed=0):
+    # Uniform samples over the API input ranges, plus the smoke-test input
+    from api.models import FEATURE_BOUNDS
+    from ml_model import TEST_INPUT
+    rng = np.random.default_rng(seed)
+    lo = np.array([FEATURE_BOUNDS[f][0] for f in features])
+    hi = np.array([FEATURE_BOUNDS[f][1] for f in features])
+    X = rng.uniform(lo, hi, size=(n, len(features)))
+    return np.vstack([[TEST_INPUT[f] for f in features], X]).astype(np.float32)
+
+def check_parity(version, n=10000, seed=0):
+    from ml_model import parity_error
+    X = parity_samples(version.features, n, seed)
+    compiled = version.session.run(None, {version.session.get_inputs()[0].name: X})[0]
+    return parity_error(compiled, version.predict_native(X))
+
+def time_per_call(fn, X, n=200):
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(X)
+    return (time.perf_counter() - start) / n * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the model pickle to ONNX and check parity")
+    parser.add_argument('--version', help="model version under MODELS_DIR (default: root pickles)")
+    parser.add_argument('--samples', type=int, default=10000, help="random inputs for the parity check")
+    args = parser.parse_args()
+
+    os.environ['MODEL_BACKEND'] = 'onnx'
+    import ml_model
+
+    if args.version:
+        directory = os.path.join(ml_model.MODELS_DIR, args.version)
+        model_path = os.path.join(directory, ml_model.MODEL_PATH)
+        features_path = os.path.join(directory, ml_model.FEATURES_PATH)
+    else:
+        model_path, features_path = ml_model.MODEL_PATH, ml_model.FEATURES_PATH
+    out_path = ml_model.onnx_path(model_path)
+
+    model = joblib.load(model_path)
+    features = list(joblib.load(features_path))
+    export_onnx(model, len(features), out_path)
+
+    version = ml_model.ModelVersion(args.version or 'default', model_path, features_path)
+    if version.session is None:
+        sys.exit("onnxruntime could not load the exported graph")
+    error = check_parity(version, args.samples)
+    if error > ml_model.PARITY_TOLERANCE:
+        os.remove(out_path)
+        sys.exit(f"Parity check failed (rel. error {error:.2e} > {ml_model.PARITY_TOLERANCE}); removed {out_path}")
+
+    print(f"Wrote {out_path} ({os.path.getsize(out_path) / 1e6:.1f} MB), parity rel. error {error:.2e} over {args.samples} inputs")
+    batch = parity_samples(features, 1000)
+    row = batch[:1]
+    for label, X in (("1 row", row), ("32 rows", batch[:32]), ("1000 rows", batch)):
+        native = time_per_call(version.predict_native, X)
+        compiled = time_per_call(version.predict, X)
+        print(f"  {label:<10}: xgboost {native:>9,.0f} us   served {compiled:>9,.0f} us   {native / compiled:.1f}x")
@@ -0,0 +1,23 @@
+import gc
+import os
+
+# Shared-model serving mode: the model is loaded once in the gunicorn master and
+# inherited copy-on-write by every forked worker instead of each worker unpickling
+# its own copy.  Run from the backend directory:
+#   gunicorn -c gunicorn.conf.py main:app
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Load the model before forking. No prediction is run here: XGBoost's OpenMP pool
+# must not be started in the master or forked workers can deadlock. The smoke test
+# runs in each worker's warm-up instead (ml_model.verify_model).
+import ml_model  # noqa: E402
+ml_model.load_model(smoke_test=False)
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the GC's tracked generations so cyclic
+    # collections in workers do not touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
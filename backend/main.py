@@ -1,13 +1,50 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 # Import routers
-from api.routers import predict, report, chat
+from api.routers import predict, report, chat, insight, optimize, health, registry, jobs, metrics, sensitivity, curing, yard
+from api.services import insight_jobs, report_renderer
+from api.services.insight_cache import insight_cache
+from api.services.executor import run_inference
+from api.services.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT
 
 load_dotenv()
 
-app = FastAPI(title="Precast Digital Chemist API")
+def warm_up():
+    # Load the model and run one prediction so the first request pays neither; a model
+    # preloaded by the gunicorn master is smoke-tested here, in the worker
+    import ml_model
+    ml_model.load_model()
+    ml_model.verify_model()
+    ml_model.predict_matrix([[0.0] * len(ml_model.get_features())])
+    ml_model.start_watcher()
+    report_renderer.warm_up()
+
+async def _background_warm_up():
+    try:
+        await run_inference(warm_up)
+    except Exception as e:
+        print(f"Model warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app):
+    await insight_jobs.start()
+    insight_cache.start()
+    warm_up_task = asyncio.create_task(_background_warm_up())
+    yield
+    warm_up_task.cancel()
+    await insight_jobs.stop()
+    report_renderer.shutdown()
+    # Write out queued insight-cache entries
+    insight_cache.close()
+    import ml_model
+    ml_model.stop_watcher()
+
+app = FastAPI(title="Precast Digital Chemist API", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend to communicate
 app.add_middleware(
@@ -16,9 +53,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+@app.middleware("http")
+async def record_latency(request, call_next):
+    # Measures time to the response start; streamed bodies (SSE, bulk PDFs) continue after
+    start = time.perf_counter()
+    status = 500
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        # Route templates (not raw paths) keep label cardinality bounded
+        route = getattr(request.scope.get('route'), 'path', 'unmatched')
+        REQUEST_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route, status=status)
+
 # Include Routers
 app.include_router(predict.router)
 app.include_router(report.router)
 app.include_router(chat.router)
+app.include_router(insight.router)
+app.include_router(optimize.router)
+app.include_router(health.router)
+app.include_router(registry.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
+app.include_router(sensitivity.router)
+app.include_router(curing.router)
+app.include_router(yard.router)
@@ -1,23 +1,534 @@
 import os
-import pandas as pd
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
 import joblib
+from api.services.metrics import span
 
-# Load models into memory once at startup
 MODEL_PATH = 'precast_multi_model.pkl'
 FEATURES_PATH = 'model_features.pkl'
 
-if os.path.exists(MODEL_PATH) and os.path.exists(FEATURES_PATH):
-    _model = joblib.load(MODEL_PATH)
-    _features = joblib.load(FEATURES_PATH)
-else:
-    raise FileNotFoundError("Model or features PKL files not found. Ensure they exist for production!")
+# Versioned artifacts live in MODELS_DIR/<version>/ (same two file names). The newest
+# version directory (natural name order, so v10 follows v9) is served unless
+# MODELS_DIR/ACTIVE names a pinned version; without any, the root pickles above are used.
+# Every gunicorn worker holds its own registry: reloads and rollbacks reach the other
+# workers through these files, which each worker's watcher polls, so all workers
+# converge within MODEL_POLL_INTERVAL.
+MODELS_DIR = os.environ.get('MODELS_DIR', 'models')
+PIN_FILE = 'ACTIVE'
+MODEL_POLL_INTERVAL = float(os.environ.get('MODEL_POLL_INTERVAL', 10))
 
-def get_prediction(input_data):
+# Inference backend: 'xgboost' (in-place booster predict) or 'onnx' (onnxruntime on the
+# graph written by compile_model.py next to the pickle; falls back to xgboost if missing)
+MODEL_BACKEND = os.environ.get('MODEL_BACKEND', 'xgboost')
+ONNX_THREADS = int(os.environ.get('ONNX_THREADS', 1))
+# onnxruntime wins on small inputs; larger batches go to the boosters, which scale better
+ONNX_MAX_ROWS = int(os.environ.get('ONNX_MAX_ROWS', 128))
+PARITY_TOLERANCE = float(os.environ.get('PARITY_TOLERANCE', 1e-3))
+
+TARGETS = [
+    'Strength gain rate',
+    'Demould time',
+    'Cost per element',
+    'Energy consumption',
+    'Mold utilization',
+    'Risk of under-strength'
+]
+
+# Smoke-test input used before a new model version is swapped in
+TEST_INPUT = {
+    'Cement content': 400,
+    'W/C ratio': 0.42,
+    'SCM %': 25,
+    'Ramp rate': 20,
+    'Hold temperature': 65,
+    'Ambient temperature': 32,
+    'Maturity index': 550,
+    'Mold availability': 85,
+    'Energy tariff': 7
+}
+
+class ModelVersion:
+    # Everything needed to serve one model version; swapped in as a single reference
+    def __init__(self, version, model_path, features_path):
+        self.version = version
+        self.model_path = model_path
+        self.features_path = features_path
+        self.signature = _file_signature(model_path, features_path)
+        self.model = joblib.load(model_path)
+        self.features = list(joblib.load(features_path))
+        self.boosters = _load_boosters(self.model)
+        self.session = _load_session(model_path) if MODEL_BACKEND == 'onnx' else None
+        self.backend = 'onnx' if self.session is not None else 'xgboost'
+        self.grid = _load_grid(self)
+        self.loaded_at = time.time()
+        self.verified = False
+
+    def predict(self, X):
+        if self.session is not None and len(X) <= ONNX_MAX_ROWS:
+            return self.session.run(None, {self.session.get_inputs()[0].name: X})[0]
+        return self.predict_native(X)
+
+    def predict_native(self, X):
+        if self.boosters is None:
+            return self.model.predict(X)
+        return np.column_stack([b.inplace_predict(X, iteration_range=r) for b, r in self.boosters])
+
+    def smoke_test(self):
+        X = np.array([[TEST_INPUT[f] for f in self.features]], dtype=np.float32)
+        preds = np.asarray(self.predict(X))
+        if preds.shape != (1, len(TARGETS)) or not np.all(np.isfinite(preds)):
+            raise ValueError(f"Model {self.version} failed smoke test: {preds!r}")
+        if self.session is not None:
+            # A compiled graph that drifted from its pickle must never be served
+            error = parity_error(preds, self.predict_native(X))
+            if error > PARITY_TOLERANCE:
+                raise ValueError(f"Model {self.version} ONNX graph differs from the pickle (rel. error {error:.2e})")
+        self.verified = True
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'model_path': self.model_path,
+            'backend': self.backend,
+            'loaded_at': self.loaded_at,
+            'response_grid': self.grid is not None
+        }
+
+# Models are loaded lazily (or by the startup warm-up in main.py) instead of at
+# import time, so importing this module is cheap and never raises
+_active = None
+_previous = None
+_load_error = None
+_rejected_signatures = set()
+# Artifacts rolled back in this worker; kept off until /models/reload unpins
+_rolled_back = set()
+_load_lock = threading.Lock()
+# Serializes reload/rollback end to end so the watcher and /models/reload never both
+# swap (which would lose _previous)
+_swap_lock = threading.Lock()
+_watcher = None
+_watcher_stop = threading.Event()
+
+def _file_signature(*paths):
+    stats = [os.stat(p) for p in paths]
+    return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+def _version_key(name):
+    # Natural order: digit runs compare as numbers
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+def list_versions():
+    if not os.path.isdir(MODELS_DIR):
+        return []
+    return sorted(
+        (name for name in os.listdir(MODELS_DIR)
+         if os.path.exists(os.path.join(MODELS_DIR, name, MODEL_PATH))
+         and os.path.exists(os.path.join(MODELS_DIR, name, FEATURES_PATH))),
+        key=_version_key
+    )
+
+def pinned_version():
+    try:
+        with open(os.path.join(MODELS_DIR, PIN_FILE)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def _pin(version):
+    # Written atomically; None removes the pin
+    path = os.path.join(MODELS_DIR, PIN_FILE)
+    if version is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        f.write(version)
+    os.replace(path + '.tmp', path)
+
+def _latest_candidate():
+    versions = list_versions()
+    pinned = pinned_version()
+    if pinned in versions:
+        versions = [pinned]
+    if versions and pinned != 'default':
+        version = versions[-1]
+        directory = os.path.join(MODELS_DIR, version)
+        return version, os.path.join(directory, MODEL_PATH), os.path.join(directory, FEATURES_PATH)
+    if os.path.exists(MODEL_PATH) and os.path.exists(FEATURES_PATH):
+        return 'default', MODEL_PATH, FEATURES_PATH
+    return None
+
+def load_model(smoke_test=True):
+    """
+    Load the served version once. Pass smoke_test=False where no prediction may run
+    (the gunicorn master, before forking); verify_model() then tests it in each worker.
+    """
+    global _active, _load_error
+    with _load_lock:
+        if _active is not None:
+            return
+        candidate = _latest_candidate()
+        if candidate is None:
+            _load_error = "Model or features PKL files not found. Ensure they exist for production!"
+            raise FileNotFoundError(_load_error)
+        try:
+            loaded = ModelVersion(*candidate)
+            if smoke_test:
+                loaded.smoke_test()
+        except Exception as e:
+            _load_error = str(e)
+            raise
+        _active = loaded
+        _load_error = None
+
+def verify_model():
+    # Smoke-test a version loaded without one; a failing version stops being served
+    global _active, _load_error
+    version = get_active()
+    if version.verified:
+        return
+    try:
+        version.smoke_test()
+    except Exception as e:
+        with _load_lock:
+            if _active is version:
+                _active = None
+            _load_error = str(e)
+        raise
+
+def is_loaded():
+    return _active is not None
+
+def load_error():
+    return _load_error
+
+def loaded_version():
+    # The served version or None; never triggers a load, so safe on the event loop
+    return _active
+
+def get_active():
+    if _active is None:
+        load_model()
+    return _active
+
+def reload_model(unpin=False):
+    """
+    Load the newest (or pinned) artifact if it differs from the active one, smoke-test
+    it and swap it in atomically. The replaced version is kept for rollback().
+    unpin=True first drops a rollback pin so the newest version is served again.
+    """
+    with _swap_lock:
+        if unpin:
+            _pin(None)
+        if pinned_version() is None:
+            _rolled_back.clear()
+        return _reload()
+
+def _reload():
+    global _active, _previous, _load_error
+    candidate = _latest_candidate()
+    if candidate is None:
+        return False
+    signature = _file_signature(candidate[1], candidate[2])
+    current = _active
+    if current is not None and (current.version, current.signature) == (candidate[0], signature):
+        return False
+    if signature in _rejected_signatures or signature in _rolled_back:
+        return False
+    try:
+        # Loading happens outside _load_lock; requests keep using the active version
+        loaded = ModelVersion(*candidate)
+        loaded.smoke_test()
+    except Exception as e:
+        _rejected_signatures.add(signature)
+        _load_error = f"{candidate[0]}: {e}"
+        print(f"Model reload rejected: {_load_error}")
+        return False
+    with _load_lock:
+        _previous, _active = _active, loaded
+        _load_error = None
+    print(f"Model version {loaded.version} is now serving")
+    return True
+
+def rollback():
+    # Pins the previous version so every worker's watcher switches to it and none swaps
+    # the rolled-back artifact straight back; /models/reload removes the pin
+    global _active, _previous
+    with _swap_lock:
+        if _previous is None:
+            return False
+        _pin(_previous.version)
+        with _load_lock:
+            _rolled_back.add(_active.signature)
+            _active, _previous = _previous, _active
+    return True
+
+def registry_status():
+    return {
+        'active': _active.describe() if _active else None,
+        'previous': _previous.describe() if _previous else None,
+        'available': list_versions(),
+        'pinned': pinned_version(),
+        'error': _load_error
+    }
+
+def start_watcher(interval=None):
+    # Poll MODELS_DIR in a daemon thread; call after forking (e.g. from the app lifespan)
+    global _watcher
+    if _watcher is not None and _watcher.is_alive():
+        return
+    interval = interval or MODEL_POLL_INTERVAL
+    _watcher_stop.clear()
+
+    def watch():
+        while not _watcher_stop.wait(interval):
+            try:
+                reload_model()
+            except Exception as e:
+                print(f"Model watcher error: {e}")
+
+    _watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+    _watcher.start()
+
+def stop_watcher():
+    _watcher_stop.set()
+
+# Fast path: call each XGBoost booster's in-place predict directly, skipping
+# pandas and the sklearn MultiOutputRegressor dispatch/validation
+def _load_boosters(model):
+    boosters = []
+    for est in getattr(model, 'estimators_', []):
+        if not hasattr(est, 'get_booster'):
+            return None
+        iteration_range = (0, est.best_iteration + 1) if hasattr(est, 'best_iteration') else (0, 0)
+        boosters.append((est.get_booster(), iteration_range))
+    return boosters or None
+
+def onnx_path(model_path):
+    return os.path.splitext(model_path)[0] + '.onnx'
+
+def _load_session(model_path):
+    path = onnx_path(model_path)
+    if not os.path.exists(path):
+        print(f"ONNX backend disabled: {path} not found (run compile_model.py)")
+        return None
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        print("ONNX backend disabled: onnxruntime is not installed")
+        return None
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = ONNX_THREADS
+    return ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+def parity_error(preds, reference):
+    # Largest absolute difference relative to each target's magnitude
+    preds, reference = np.asarray(preds, dtype=np.float64), np.asarray(reference, dtype=np.float64)
+    scale = np.maximum(np.abs(reference).max(axis=0), 1.0)
+    return float((np.abs(preds - reference) / scale).max())
+
+_row_local = threading.local()
+
+def _row_buffer(n_features):
+    # One preallocated contiguous row per thread so concurrent requests never share it
+    row = getattr(_row_local, 'row', None)
+    if row is None or row.shape[1] != n_features:
+        row = np.empty((1, n_features), dtype=np.float32)
+        _row_local.row = row
+    return row
+
+def get_features():
+    return list(get_active().features)
+
+def predict_matrix(X):
+    # Raw (N, 9) -> (N, 6) float32 predictions in feature / TARGETS order, no rounding
+    version = get_active()
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    with span('model_predict'):
+        return version.predict(X)
+
+class PredictionCache:
+    # Bounded LRU + TTL cache of formatted predictions keyed on the model version and
+    # quantized inputs, so entries from a replaced model are never served.
+    def __init__(self, maxsize=1024, ttl=300.0, precision=3):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, input_data, version):
+        return (version.version, version.signature) + tuple(
+            round(float(input_data[f]), self.precision) for f in version.features
+        )
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+prediction_cache = PredictionCache(
+    maxsize=int(os.environ.get('PREDICTION_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('PREDICTION_CACHE_TTL', 300)),
+    precision=int(os.environ.get('PREDICTION_CACHE_PRECISION', 3))
+)
+
+# Optional precomputed response surface (see response_grid.py), memory-mapped so
+# every worker shares one copy through the OS page cache
+RESPONSE_GRID_PATH = os.environ.get('RESPONSE_GRID_PATH')
+RESPONSE_GRID_TOLERANCE = float(os.environ.get('RESPONSE_GRID_TOLERANCE', 0.02))
+
+def _load_grid(version):
+    if not RESPONSE_GRID_PATH or not os.path.exists(RESPONSE_GRID_PATH):
+        return None
+    from response_grid import ResponseGrid
+    try:
+        grid = ResponseGrid.load(RESPONSE_GRID_PATH, version.model_path, RESPONSE_GRID_TOLERANCE)
+    except (OSError, ValueError) as e:
+        print(f"Response grid disabled: {e}")
+        return None
+    if grid.features != version.features or grid.targets != TARGETS:
+        print("Response grid disabled: feature/target layout does not match the model")
+        return None
+    return grid
+
+def get_prediction(input_data, with_version=False):
+    version = get_active()
+    if prediction_cache.maxsize <= 0:
+        result = _predict_point(input_data, version)
+    else:
+        key = prediction_cache.key(input_data, version)
+        cached = prediction_cache.get(key)
+        if cached is not None:
+            result = dict(cached)
+        else:
+            # Score the quantized point so every input in a bucket gets the same answer
+            result = _predict_point(dict(zip(version.features, key[2:])), version)
+            prediction_cache.put(key, result)
+            result = dict(result)
+    return (result, version.version) if with_version else result
+
+def get_prediction_batch(list_of_inputs):
+    """
+    get_prediction for many independent rows (used by the /predict micro-batcher):
+    cache and response-grid hits are answered directly, the rest in one predict call.
+    Returns (results, model_version).
+    """
+    version = get_active()
+    results = [None] * len(list_of_inputs)
+    pending = []
+    for i, input_data in enumerate(list_of_inputs):
+        key = None
+        if prediction_cache.maxsize > 0:
+            key = prediction_cache.key(input_data, version)
+            cached = prediction_cache.get(key)
+            if cached is not None:
+                results[i] = dict(cached)
+                continue
+        values = key[2:] if key is not None else [input_data[f] for f in version.features]
+        if version.grid is not None:
+            preds = version.grid.lookup(values)
+            if preds is not None:
+                result = _format_prediction(preds)
+                if key is not None:
+                    prediction_cache.put(key, result)
+                results[i] = dict(result)
+                continue
+        pending.append((i, key, values))
+
+    if pending:
+        with span('feature_assembly'):
+            X = np.array([values for _, _, values in pending], dtype=np.float32)
+        with span('model_predict'):
+            preds = version.predict(X)
+        for (i, key, _), p in zip(pending, preds):
+            result = _format_prediction(p)
+            if key is not None:
+                prediction_cache.put(key, result)
+            results[i] = dict(result)
+    return results, version.version
+
+def _predict_point(input_data, version):
+    # Interpolate from the response grid when the query is inside it and the cell
+    # passes the tolerance check; cold queries fall back to real inference
+    if version.grid is not None:
+        preds = version.grid.lookup([input_data[f] for f in version.features])
+        if preds is not None:
+            return _format_prediction(preds)
+    return _predict_one(input_data, version)
+
+def _predict_one(input_data, version=None):
+    version = version or get_active()
+    with span('feature_assembly'):
+        row = _row_buffer(len(version.features))
+        for i, f in enumerate(version.features):
+            row[0, i] = input_data[f]
+
+    with span('model_predict'):
+        preds = version.predict(row)[0]
+
+    return _format_prediction(preds)
+
+def get_prediction_legacy(input_data):
+    # Original pandas implementation, kept for parity checks and benchmark.py
+    import pandas as pd
+    version = get_active()
     df_in = pd.DataFrame([input_data])
-    df_in = df_in[_features]
-    
-    preds = _model.predict(df_in)[0]
+    df_in = df_in[version.features]
+
+    preds = version.model.predict(df_in)[0]
 
+    return _format_prediction(preds)
+
+def get_predictions(list_of_inputs, with_version=False):
+    # Score many scenarios with a single predict call instead of one per row
+    version = get_active()
+    results = []
+    if list_of_inputs:
+        with span('feature_assembly'):
+            X = np.array([[row[f] for f in version.features] for row in list_of_inputs], dtype=np.float32)
+        with span('model_predict'):
+            preds = version.predict(X)
+        results = [_format_prediction(p) for p in preds]
+    return (results, version.version) if with_version else results
+
+def _format_prediction(preds):
     return {
         'Strength gain rate': round(preds[0], 2),
         'Demould time': round(preds[1], 1),
@@ -29,17 +540,7 @@ def get_prediction(input_data):
 
 if __name__ == "__main__":
     print("\n--- TEST PREDICTION LOGIC ---")
-    test_input = {
-        'Cement content': 400,
-        'W/C ratio': 0.42,
-        'SCM %': 25,
-        'Ramp rate': 20,
-        'Hold temperature': 65,
-        'Ambient temperature': 32,
-        'Maturity index': 550,
-        'Mold availability': 85,
-        'Energy tariff': 7
-    }
+    test_input = TEST_INPUT
     result = get_prediction(test_input)
     print("Inputs:")
     for k, v in test_input.items():
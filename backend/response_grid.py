@@ -0,0 +1,180 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import numpy as np
+
+# Precomputed response surface for what-if slider queries. An offline build step
+# evaluates the multi-output model over a regular lattice of the nine features and
+# stores it as a float32 .npy file; at serve time the file is memory-mapped (so all
+# workers share the page cache) and queries are answered by multilinear interpolation.
+# The build also scores every cell centre against the real model; cells whose
+# interpolation error exceeds the tolerance are answered by real inference instead.
+
+GRID_PATH = 'response_grid.npy'
+BUILD_CHUNK = 65536
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def meta_path(grid_path):
+    return os.path.splitext(grid_path)[0] + '.json'
+
+def error_path(grid_path):
+    return os.path.splitext(grid_path)[0] + '.cells.npy'
+
+def _corner_offsets(points):
+    # Corner offsets of a hypercube cell over the axes that actually vary
+    varying = np.where(np.asarray(points) > 1)[0]
+    bits = (np.arange(2 ** len(varying))[:, None] >> np.arange(len(varying))) & 1
+    offsets = np.zeros((len(bits), len(points)), dtype=np.int64)
+    offsets[:, varying] = bits
+    return offsets, varying
+
+def build_grid(predict_matrix, features, targets, axes, grid_path=GRID_PATH, model_path=None, chunk=BUILD_CHUNK):
+    """
+    axes maps feature -> (min, max, points). Writes the (points..., n_targets) float32
+    lattice to grid_path chunk by chunk so memory stays flat, plus a JSON sidecar.
+    """
+    spec = [axes[f] for f in features]
+    values = [np.linspace(lo, hi, int(n)) if int(n) > 1 else np.array([float(lo)]) for lo, hi, n in spec]
+    shape = tuple(len(v) for v in values)
+    total = int(np.prod(shape))
+
+    grid = np.lib.format.open_memmap(grid_path, mode='w+', dtype=np.float32, shape=shape + (len(targets),))
+    flat = grid.reshape(total, len(targets))
+    start = time.perf_counter()
+    for begin in range(0, total, chunk):
+        end = min(begin + chunk, total)
+        idx = np.unravel_index(np.arange(begin, end), shape)
+        X = np.column_stack([values[d][idx[d]] for d in range(len(features))])
+        flat[begin:end] = predict_matrix(X)
+    grid.flush()
+    target_ranges = np.maximum(np.ptp(flat, axis=0).astype(np.float64), 1e-9)
+
+    # Validate each cell: relative error of the interpolated centre vs the real model
+    points = np.array(shape)
+    offsets, varying = _corner_offsets(points)
+    cell_shape = tuple(int(n) for n in np.maximum(points - 1, 1))
+    cells = np.lib.format.open_memmap(error_path(grid_path), mode='w+', dtype=np.float16, shape=cell_shape)
+    cells_flat = cells.reshape(-1)
+    lo = np.array([v[0] for v in values])
+    step = np.array([v[1] - v[0] if len(v) > 1 else 0.0 for v in values])
+    cell_chunk = max(1, chunk // len(offsets))
+    for begin in range(0, cells_flat.size, cell_chunk):
+        end = min(begin + cell_chunk, cells_flat.size)
+        base = np.column_stack(np.unravel_index(np.arange(begin, end), cell_shape))
+        corners = np.ravel_multi_index((base[:, None, :] + offsets[None, :, :]).reshape(-1, len(shape)).T, shape)
+        interpolated = flat[corners].reshape(end - begin, len(offsets), -1).mean(axis=1)
+        centre = lo + (base + 0.5 * (points > 1)) * step
+        truth = predict_matrix(centre)
+        cells_flat[begin:end] = (np.abs(interpolated - truth) / target_ranges).max(axis=1)
+    cells.flush()
+
+    meta = {
+        'features': list(features),
+        'targets': list(targets),
+        'axes': [[float(lo), float(hi), int(n)] for lo, hi, n in spec],
+        'target_ranges': [float(r) for r in target_ranges],
+        'model_sha256': file_sha256(model_path) if model_path else None,
+        'build_seconds': round(time.perf_counter() - start, 2)
+    }
+    del grid, flat, cells, cells_flat
+    with open(meta_path(grid_path), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+class ResponseGrid:
+    def __init__(self, grid, cell_error, meta, tolerance=0.02):
+        self.grid = grid
+        self.cell_error = cell_error
+        self.meta = meta
+        self.tolerance = tolerance
+        self.features = meta['features']
+        self.targets = meta['targets']
+        axes = np.array(meta['axes'], dtype=np.float64)
+        self.lo, self.hi, self.points = axes[:, 0], axes[:, 1], axes[:, 2].astype(int)
+        self.step = np.where(self.points > 1, (self.hi - self.lo) / np.maximum(self.points - 1, 1), 1.0)
+        self.shape = tuple(int(n) for n in self.points)
+        self.flat = grid.reshape(-1, len(self.targets))
+        self.offsets, self.varying = _corner_offsets(self.points)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, grid_path=GRID_PATH, model_path=None, tolerance=0.02):
+        with open(meta_path(grid_path)) as f:
+            meta = json.load(f)
+        if model_path and meta.get('model_sha256') and meta['model_sha256'] != file_sha256(model_path):
+            raise ValueError(f"{grid_path} was built from a different model; rebuild it")
+        grid = np.load(grid_path, mmap_mode='r')
+        cell_error = np.load(error_path(grid_path), mmap_mode='r')
+        return cls(grid, cell_error, meta, tolerance)
+
+    def lookup(self, x):
+        """
+        x is a feature vector in self.features order. Returns interpolated targets,
+        or None if x is outside the lattice or its cell failed the tolerance check.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        pos = (x - self.lo) / self.step
+        if np.any(pos < -1e-9) or np.any(pos > self.points - 1 + 1e-9):
+            return self._miss()
+        base = np.clip(np.floor(pos).astype(np.int64), 0, np.maximum(self.points - 2, 0))
+        if self.cell_error[tuple(base)] > self.tolerance:
+            return self._miss()
+        frac = np.clip(pos - base, 0.0, 1.0)
+        corners = base + self.offsets
+        values = self.flat[np.ravel_multi_index(corners.T, self.shape)].astype(np.float64)
+        weights = np.prod(np.where(self.offsets[:, self.varying] == 1, frac[self.varying], 1 - frac[self.varying]), axis=1)
+        with self._lock:
+            self.hits += 1
+        return weights @ values
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'points': int(np.prod(self.shape)),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+    def _miss(self):
+        with self._lock:
+            self.misses += 1
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the response-surface grid for ml_model")
+    parser.add_argument('--points', type=int, default=5, help="lattice points per feature")
+    parser.add_argument('--axis', action='append', default=[], metavar="FEATURE=MIN:MAX:POINTS",
+                        help="override one axis, e.g. 'Energy tariff=7:7:1'")
+    parser.add_argument('--out', default=GRID_PATH)
+    args = parser.parse_args()
+
+    import ml_model
+    from api.models import FEATURE_BOUNDS
+
+    axes = {f: (lo, hi, args.points) for f, (lo, hi) in FEATURE_BOUNDS.items()}
+    for override in args.axis:
+        name, spec = override.split('=')
+        lo, hi, n = spec.split(':')
+        axes[name] = (float(lo), float(hi), int(n))
+    unknown = [f for f in axes if f not in ml_model.get_features()]
+    if unknown:
+        sys.exit(f"Unknown features: {unknown}")
+
+    meta = build_grid(ml_model.predict_matrix, ml_model.get_features(), ml_model.TARGETS, axes,
+                      args.out, model_path=ml_model.get_active().model_path)
+    size_mb = (os.path.getsize(args.out) + os.path.getsize(error_path(args.out))) / 1e6
+    print(f"Wrote {args.out} ({size_mb:.1f} MB) in {meta['build_seconds']}s")
@@ -0,0 +1,75 @@
+import time
+import asyncio
+import threading
+import pytest
+from api.services.batcher import MicroBatcher
+
+# Drives MicroBatcher with a stub model call that records every batch it receives,
+# checking that coalesced callers get their own rows back and share failures.
+# Run with: python -m pytest -q test_batcher.py
+
+class StubModel:
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def __call__(self, items):
+        with self._lock:
+            self.batches.append(list(items))
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [{'row': item, 'doubled': item * 2} for item in items], 'v1'
+
+async def submit_all(batcher, items, timeout=5.0):
+    # A caller whose future is never resolved fails the test instead of hanging it
+    calls = asyncio.gather(*(batcher.submit(item) for item in items), return_exceptions=True)
+    return await asyncio.wait_for(calls, timeout)
+
+def test_each_caller_gets_its_own_row():
+    model = StubModel()
+    batcher = MicroBatcher(model, max_batch=64, window_ms=20)
+    results = asyncio.run(submit_all(batcher, range(50)))
+    assert results == [({'row': i, 'doubled': i * 2}, 'v1') for i in range(50)]
+    # The first row goes out alone; the rest queue behind it and are coalesced
+    assert model.batches[0] == [0]
+    assert len(model.batches) < 50
+    assert sorted(row for batch in model.batches for row in batch) == list(range(50))
+
+def test_rows_are_coalesced_in_submission_order():
+    model = StubModel()
+    batcher = MicroBatcher(model, max_batch=64, window_ms=20)
+    asyncio.run(submit_all(batcher, range(10)))
+    assert model.batches == [[0], list(range(1, 10))]
+
+def test_full_batch_dispatches_before_the_window():
+    model = StubModel(delay=0.2)
+    batcher = MicroBatcher(model, max_batch=4, window_ms=10000)
+    start = time.monotonic()
+    results = asyncio.run(submit_all(batcher, range(5)))
+    assert [result for result, _ in results] == [{'row': i, 'doubled': i * 2} for i in range(5)]
+    assert model.batches == [[0], [1, 2, 3, 4]]
+    assert time.monotonic() - start < 2.0
+
+def test_model_error_reaches_every_waiting_caller():
+    model = StubModel(error=ValueError("model exploded"))
+    batcher = MicroBatcher(model, max_batch=64, window_ms=20)
+    results = asyncio.run(submit_all(batcher, range(10)))
+    assert len(model.batches) == 2
+    for result in results:
+        assert isinstance(result, ValueError)
+        assert str(result) == "model exploded"
+
+def test_recovers_after_a_failed_batch():
+    model = StubModel(delay=0.0, error=RuntimeError("transient"))
+    batcher = MicroBatcher(model, max_batch=64, window_ms=20)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await batcher.submit(1)
+        model.error = None
+        return await batcher.submit(2)
+
+    assert asyncio.run(scenario()) == ({'row': 2, 'doubled': 4}, 'v1')
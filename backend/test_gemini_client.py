@@ -0,0 +1,123 @@
+import time
+import socket
+import asyncio
+import threading
+import pytest
+
+pytest.importorskip("google.genai")
+uvicorn = pytest.importorskip("uvicorn")
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from api.services import gemini_client
+
+# Points the shared Gemini client at a local stub server through GEMINI_BASE_URL and
+# checks the retry and timeout settings against scripted upstream failures.
+# Run with: python -m pytest -q test_gemini_client.py
+
+REPLY = {"candidates": [{"content": {"role": "model", "parts": [{"text": "stub reply"}]}, "finishReason": "STOP"}]}
+
+class StubGemini:
+    def __init__(self):
+        # Each request pops the next (status, delay_seconds); the last entry repeats
+        self.script = [(200, 0.0)]
+        self.requests = 0
+        app = Starlette(routes=[Route("/{path:path}", self.handle, methods=["POST"])])
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="error"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def handle(self, request):
+        self.requests += 1
+        status, delay = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if delay:
+            await asyncio.sleep(delay)
+        if status != 200:
+            return JSONResponse({"error": {"code": status, "message": "stub failure", "status": "UNAVAILABLE"}}, status_code=status)
+        return JSONResponse(REPLY)
+
+    def start(self):
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("stub server did not start")
+            time.sleep(0.02)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+@pytest.fixture(scope="module")
+def stub():
+    server = StubGemini()
+    server.start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(gemini_client, "GEMINI_BASE_URL", stub.url)
+    monkeypatch.setattr(gemini_client, "GEMINI_TIMEOUT", 0.5)
+    monkeypatch.setattr(gemini_client, "GEMINI_RETRY_ATTEMPTS", 3)
+    monkeypatch.setattr(gemini_client, "GEMINI_RETRY_INITIAL_DELAY", 0.01)
+    monkeypatch.setattr(gemini_client, "GEMINI_RETRY_MAX_DELAY", 0.05)
+    monkeypatch.setattr(gemini_client, "_client", None)
+    stub.requests = 0
+    yield gemini_client.get_client()
+    monkeypatch.setattr(gemini_client, "_client", None)
+
+def generate(client):
+    return asyncio.run(client.aio.models.generate_content(model=gemini_client.GEMINI_MODEL, contents="ping"))
+
+def test_client_uses_base_url(stub, client):
+    stub.script = [(200, 0.0)]
+    assert generate(client).text == "stub reply"
+    assert stub.requests == 1
+
+def test_client_is_shared_until_key_changes(client, monkeypatch):
+    assert gemini_client.get_client() is client
+    monkeypatch.setenv("GEMINI_API_KEY", "rotated-key")
+    assert gemini_client.get_client() is not client
+
+def test_retries_transient_errors(stub, client):
+    stub.script = [(503, 0.0), (503, 0.0), (200, 0.0)]
+    assert generate(client).text == "stub reply"
+    assert stub.requests == 3
+
+def test_gives_up_after_retry_attempts(stub, client):
+    from google.genai import errors
+    stub.script = [(503, 0.0)]
+    with pytest.raises(errors.ServerError):
+        generate(client)
+    assert stub.requests == gemini_client.GEMINI_RETRY_ATTEMPTS
+
+def test_does_not_retry_client_errors(stub, client):
+    from google.genai import errors
+    stub.script = [(400, 0.0)]
+    with pytest.raises(errors.ClientError):
+        generate(client)
+    assert stub.requests == 1
+
+def test_times_out_and_retries_slow_upstream(stub, client):
+    import httpx
+    stub.script = [(200, 3.0)]
+    start = time.monotonic()
+    with pytest.raises(httpx.TimeoutException):
+        generate(client)
+    elapsed = time.monotonic() - start
+    # Every attempt is cut off at GEMINI_TIMEOUT instead of waiting for the 3 s reply
+    assert stub.requests == gemini_client.GEMINI_RETRY_ATTEMPTS
+    assert elapsed < stub.requests * (gemini_client.GEMINI_TIMEOUT + gemini_client.GEMINI_RETRY_MAX_DELAY) + 1.0
+
+def test_recovers_after_a_timeout(stub, client):
+    stub.script = [(200, 3.0), (200, 0.0)]
+    assert generate(client).text == "stub reply"
+    assert stub.requests == 2
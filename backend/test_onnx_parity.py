@@ -0,0 +1,69 @@
+import os
+import shutil
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+import ml_model
+from compile_model import export_onnx, parity_samples
+
+# Loads the same model version with the native XGBoost boosters and the compiled ONNX
+# graph and checks both backends agree on sampled inputs within PARITY_TOLERANCE.
+# The graph is compiled fresh from the pickle when the converters are installed,
+# otherwise the precast_multi_model.onnx from compile_model.py is used.
+# Run with: python -m pytest -q test_onnx_parity.py
+
+SAMPLES = 2000
+
+@pytest.fixture(scope="module")
+def version(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("onnx_parity")
+    model_path = str(directory / ml_model.MODEL_PATH)
+    features_path = str(directory / ml_model.FEATURES_PATH)
+    shutil.copy(ml_model.MODEL_PATH, model_path)
+    shutil.copy(ml_model.FEATURES_PATH, features_path)
+    try:
+        import joblib
+        export_onnx(joblib.load(model_path), len(joblib.load(features_path)), ml_model.onnx_path(model_path))
+    except ImportError:
+        if not os.path.exists(ml_model.onnx_path(ml_model.MODEL_PATH)):
+            pytest.skip("no ONNX graph and skl2onnx/onnxmltools are not installed to compile one")
+        shutil.copy(ml_model.onnx_path(ml_model.MODEL_PATH), ml_model.onnx_path(model_path))
+
+    backend = ml_model.MODEL_BACKEND
+    ml_model.MODEL_BACKEND = 'onnx'
+    try:
+        loaded = ml_model.ModelVersion('parity', model_path, features_path)
+    finally:
+        ml_model.MODEL_BACKEND = backend
+    assert loaded.session is not None
+    return loaded
+
+def run_onnx(version, X):
+    return version.session.run(None, {version.session.get_inputs()[0].name: X})[0]
+
+def test_backends_agree_on_sampled_inputs(version):
+    X = parity_samples(version.features, SAMPLES, seed=1)
+    compiled = run_onnx(version, X)
+    native = version.predict_native(X)
+    assert compiled.shape == native.shape == (len(X), len(ml_model.TARGETS))
+    assert np.all(np.isfinite(compiled))
+    assert ml_model.parity_error(compiled, native) <= ml_model.PARITY_TOLERANCE
+
+def test_backends_agree_per_target(version):
+    X = parity_samples(version.features, SAMPLES, seed=2)
+    compiled, native = run_onnx(version, X), version.predict_native(X)
+    for i, target in enumerate(ml_model.TARGETS):
+        error = ml_model.parity_error(compiled[:, [i]], native[:, [i]])
+        assert error <= ml_model.PARITY_TOLERANCE, f"{target}: rel. error {error:.2e}"
+
+def test_served_predictions_match_native_on_both_paths(version):
+    # Small batches are served by onnxruntime, larger ones by the boosters
+    for rows in (1, ml_model.ONNX_MAX_ROWS, ml_model.ONNX_MAX_ROWS + 1):
+        X = parity_samples(version.features, rows - 1, seed=rows)
+        assert ml_model.parity_error(version.predict(X), version.predict_native(X)) <= ml_model.PARITY_TOLERANCE
+
+def test_smoke_test_passes_on_onnx_backend(version):
+    assert version.backend == 'onnx'
+    version.smoke_test()
+    assert version.verified
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from api.models import FEATURE_BOUNDS, UNCONTROLLABLE_FEATURES, PredictionRequest
+from api.services.pareto import pareto_search
+
+# Multi-objective search keeps site conditions at the base scenario unless the caller
+# explicitly opens them up. Uses a toy model whose cost falls with every input, so any
+# feature left free would be pushed to its lower bound.
+# Run with: python -m pytest -q test_pareto.py
+
+FEATURES = list(FEATURE_BOUNDS)
+TARGETS = ['Strength gain rate', 'Demould time', 'Cost per element', 'Energy consumption',
+           'Mold utilization', 'Risk of under-strength']
+
+def toy_predict(X):
+    X = np.asarray(X, dtype=np.float64)
+    lo = np.array([FEATURE_BOUNDS[f][0] for f in FEATURES])
+    hi = np.array([FEATURE_BOUNDS[f][1] for f in FEATURES])
+    scaled = (X - lo) / (hi - lo)
+    cost = scaled.sum(axis=1)
+    demould = 1.0 - scaled[:, FEATURES.index('Hold temperature')] + 0.1 * scaled[:, FEATURES.index('Ambient temperature')]
+    risk = scaled[:, FEATURES.index('W/C ratio')]
+    zeros = np.zeros(len(X))
+    return np.column_stack([zeros, demould, cost, zeros, zeros, risk])
+
+def search(**kwargs):
+    return pareto_search(toy_predict, FEATURES, TARGETS, population_size=40, generations=20, seed=1, **kwargs)
+
+def test_site_conditions_stay_at_base_scenario():
+    base = PredictionRequest(ambient_temperature=27.0, mold_availability=90.0, energy_tariff=9.5).to_input_data()
+    result = search(base=base)
+    assert result['front']
+    for point in result['front']:
+        for feature in UNCONTROLLABLE_FEATURES:
+            assert point['inputs'][feature] == pytest.approx(base[feature])
+
+def test_defaults_pin_site_conditions_to_default_scenario():
+    defaults = PredictionRequest().to_input_data()
+    for point in search()['front']:
+        for feature in UNCONTROLLABLE_FEATURES:
+            assert point['inputs'][feature] == pytest.approx(defaults[feature])
+
+def test_controllable_features_are_still_searched():
+    fronts = search()['front']
+    cement = {point['inputs']['Cement content'] for point in fronts}
+    assert min(cement) < PredictionRequest().cement_content
+
+def test_explicit_bounds_open_a_site_condition():
+    result = search(bounds={'Energy tariff': [2.0, 15.0]})
+    tariffs = [point['inputs']['Energy tariff'] for point in result['front']]
+    assert min(tariffs) < PredictionRequest().energy_tariff
+    for point in result['front']:
+        assert point['inputs']['Ambient temperature'] == pytest.approx(PredictionRequest().ambient_temperature)
@@ -0,0 +1,75 @@
+import copy
+from types import SimpleNamespace
+import pytest
+import ml_model
+from ml_model import PredictionCache, TEST_INPUT
+
+# Keys are the model version plus the inputs rounded to `precision` decimals, so
+# near-identical scenarios share an entry and a swapped model never serves stale ones.
+# Run with: python -m pytest -q test_prediction_cache.py
+
+FEATURES = list(TEST_INPUT)
+
+def version(name='v1', signature=(1, 1)):
+    return SimpleNamespace(version=name, signature=signature, features=FEATURES)
+
+def nudged(feature, delta):
+    return {**TEST_INPUT, feature: TEST_INPUT[feature] + delta}
+
+def test_hit_for_same_inputs_and_version():
+    cache = PredictionCache(precision=3)
+    cache.put(cache.key(TEST_INPUT, version()), {'Demould time': 8.0})
+    assert cache.get(cache.key(dict(TEST_INPUT), version())) == {'Demould time': 8.0}
+    assert cache.stats()['hits'] == 1
+
+def test_miss_after_version_swap():
+    cache = PredictionCache()
+    cache.put(cache.key(TEST_INPUT, version('v1')), {'Demould time': 8.0})
+    assert cache.get(cache.key(TEST_INPUT, version('v2'))) is None
+    # Same version name re-published with different files
+    assert cache.get(cache.key(TEST_INPUT, version('v1', signature=(2, 2)))) is None
+    assert cache.stats()['misses'] == 2
+
+def test_inputs_within_one_quantization_step_share_an_entry():
+    cache = PredictionCache(precision=3)
+    cache.put(cache.key(nudged('W/C ratio', 0.0001), version()), {'Demould time': 8.0})
+    assert cache.get(cache.key(nudged('W/C ratio', 0.0002), version())) == {'Demould time': 8.0}
+
+def test_miss_across_quantization_step():
+    cache = PredictionCache(precision=3)
+    cache.put(cache.key(nudged('W/C ratio', 0.0004), version()), {'Demould time': 8.0})
+    assert cache.get(cache.key(nudged('W/C ratio', 0.0006), version())) is None
+
+def test_expired_entries_miss(monkeypatch):
+    cache = PredictionCache(ttl=10.0)
+    key = cache.key(TEST_INPUT, version())
+    monkeypatch.setattr(ml_model.time, 'monotonic', lambda: 100.0)
+    cache.put(key, {'Demould time': 8.0})
+    monkeypatch.setattr(ml_model.time, 'monotonic', lambda: 110.0)
+    assert cache.get(key) is None
+    assert cache.stats()['size'] == 0
+
+def test_evicts_least_recently_used():
+    cache = PredictionCache(maxsize=2)
+    keys = [cache.key(nudged('Cement content', i), version()) for i in range(3)]
+    cache.put(keys[0], 0)
+    cache.put(keys[1], 1)
+    cache.get(keys[0])
+    cache.put(keys[2], 2)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 0 and cache.get(keys[2]) == 2
+
+def test_get_prediction_misses_after_model_swap(monkeypatch):
+    monkeypatch.setattr(ml_model, 'prediction_cache', PredictionCache())
+    first = ml_model.get_prediction(TEST_INPUT)
+    assert ml_model.get_prediction(TEST_INPUT) == first
+    assert ml_model.prediction_cache.stats()['hits'] == 1
+
+    swapped = copy.copy(ml_model.get_active())
+    swapped.version = 'swapped'
+    monkeypatch.setattr(ml_model, '_active', swapped)
+    result, served = ml_model.get_prediction(TEST_INPUT, with_version=True)
+    assert served == 'swapped'
+    assert result == first
+    assert ml_model.prediction_cache.stats() == pytest.approx(
+        {'size': 2, 'maxsize': 1024, 'hits': 1, 'misses': 2, 'hit_rate': 0.3333})
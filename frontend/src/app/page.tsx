@@ -20,6 +20,7 @@ interface OptimizationResult {
     "Risk of under-strength": number;
   };
   insight: string;
+  insight_id?: string;
   tracker_data: {
     categories: string[];
     before: number[];
@@ -58,6 +59,15 @@ export default function Home() {
     chatEndRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [chatHistory, chatLoading]);
 
+  const [chatSessionId, setChatSessionId] = useState<string | null>(null);
+  const createChatSession = async () => {
+    const res = await fetch(process.env.NEXT_PUBLIC_BACKEND_URL + "chat/session", { method: "POST" });
+    if (!res.ok) throw new Error("Failed to start chat session.");
+    const data = await res.json();
+    setChatSessionId(data.session_id);
+    return data.session_id as string;
+  };
+
   const handleSendMessage = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!chatInput.trim()) return;
@@ -70,16 +80,47 @@ export default function Home() {
     setChatLoading(true);
 
     try {
-      const res = await fetch(process.env.NEXT_PUBLIC_BACKEND_URL + "chat", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ messages: updatedHistory }),
-      });
+      // History lives server-side; only the new message is sent once a session exists
+      const sendTurn = (sessionId: string, messages: { role: string; content: string }[]) =>
+        fetch(process.env.NEXT_PUBLIC_BACKEND_URL + "chat/stream", {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ session_id: sessionId, messages }),
+        });
+
+      let res = chatSessionId ? await sendTurn(chatSessionId, [newMessage]) : null;
+      if (!res || res.status === 404) {
+        const sessionId = await createChatSession();
+        res = await sendTurn(sessionId, updatedHistory);
+      }
       
-      if (!res.ok) throw new Error("Failed to send message.");
+      if (!res.ok || !res.body) throw new Error("Failed to send message.");
       
-      const data = await res.json();
-      setChatHistory(prev => [...prev, { role: "model", content: data.response }]);
+      // Relay Server-Sent Events into the last chat bubble as tokens arrive
+      setChatHistory(prev => [...prev, { role: "model", content: "" }]);
+      setChatLoading(false);
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop() ?? "";
+        for (const evt of events) {
+          const dataLine = evt.split("\n").find(l => l.startsWith("data: "));
+          if (!dataLine) continue;
+          const payload = JSON.parse(dataLine.slice(6));
+          if (evt.startsWith("event: error")) throw new Error(payload.detail);
+          if (payload.text) {
+            setChatHistory(prev => {
+              const last = prev[prev.length - 1];
+              return [...prev.slice(0, -1), { ...last, content: last.content + payload.text }];
+            });
+          }
+        }
+      }
     } catch (err) {
       console.error(err);
       setChatHistory(prev => [...prev, { role: "model", content: "Sorry, I am having trouble connecting to the server right now." }]);
@@ -116,6 +157,7 @@ export default function Home() {
       const elapsed = Date.now() - startTime;
       if (elapsed < 1800) await new Promise(r => setTimeout(r, 1800 - elapsed));
       setResult(data);
+      if (data.insight_id) fetchInsight(data.insight_id);
     } catch (err: any) {
       setError(err.message);
     } finally {
@@ -123,23 +165,47 @@ export default function Home() {
     }
   };
 
+  // The LLM insight is generated in the background; swap it in once ready
+  const fetchInsight = async (insightId: string) => {
+    try {
+      const res = await fetch(process.env.NEXT_PUBLIC_BACKEND_URL + `insight/${insightId}?wait=25`);
+      if (!res.ok) return;
+      const data = await res.json();
+      if (data.status === "ready" && data.insight) {
+        setResult(prev => prev && prev.insight_id === insightId ? { ...prev, insight: data.insight } : prev);
+      }
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
   const [downloadingReport, setDownloadingReport] = useState<boolean>(false);
+  // Last downloaded report; the backend answers 304 when the ETag still matches
+  const lastReportRef = useRef<{ etag: string; blob: Blob } | null>(null);
   const handleDownloadPDF = async () => {
     if (!result) return;
     setDownloadingReport(true);
     try {
+      const headers: Record<string, string> = { "Content-Type": "application/json" };
+      if (lastReportRef.current) headers["If-None-Match"] = lastReportRef.current.etag;
       const res = await fetch(process.env.NEXT_PUBLIC_BACKEND_URL + "report", {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers,
         body: JSON.stringify({
           metrics: result.metrics,
           insight: result.insight
         }),
       });
       
-      if (!res.ok) throw new Error("Failed to generate PDF.");
-      
-      const blob = await res.blob();
+      let blob: Blob;
+      if (res.status === 304 && lastReportRef.current) {
+        blob = lastReportRef.current.blob;
+      } else {
+        if (!res.ok) throw new Error("Failed to generate PDF.");
+        blob = await res.blob();
+        const etag = res.headers.get("ETag");
+        lastReportRef.current = etag ? { etag, blob } : null;
+      }
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;